@@ -0,0 +1,217 @@
+import os
+import glob
+import hashlib
+import threading
+import subprocess
+import time
+import logging
+import runner
+
+try:
+    # Optional: PyObjC gives us an in-process player that keeps sounds resident in memory.
+    from AVFoundation import AVAudioPlayer
+    from Foundation import NSData
+except ImportError:
+    AVAudioPlayer = None
+
+BOOTUP_CUE = 'bootup'
+PLAYBACK_TIMEOUT = 300 # Seconds; no cue should play longer than this
+CONVERT_TIMEOUT = 30
+CUE_CACHE_DIR = os.path.expanduser("~/.jarvis-cues") # Converted cues, reused across boots
+
+
+class AfplayBackend:
+    """Plays cues through `afplay`, one child process per play.
+
+    Loading converts each cue once to 16-bit PCM WAV, so afplay doesn't have to decode compressed
+    audio on every play, and reads it so the page cache holds it. Conversions are cached in cache_dir
+    by source path and modification time, so only the first boot after a cue changes runs afconvert.
+    Each play still pays a process spawn; install PyObjC for the in-process AVFoundationBackend when that matters.
+    """
+
+    def __init__(self, cache_dir=CUE_CACHE_DIR):
+        self.cache_dir = cache_dir
+
+    def _convert(self, path):
+        # Returns the cached PCM copy of path, converting it first if the source is new or has changed
+        source = os.path.abspath(path)
+        path_key = hashlib.sha256(source.encode()).hexdigest()[:16]
+        name = f"{path_key}-{os.stat(source).st_mtime_ns}-{os.path.basename(source)}.wav"
+        pcm_path = os.path.join(self.cache_dir, name)
+        if os.path.exists(pcm_path):
+            return pcm_path
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = os.path.join(self.cache_dir, f".{name}")
+        result = runner.run(["afconvert", "-f", "WAVE", "-d", "LEI16", source, tmp_path], timeout=CONVERT_TIMEOUT)
+        if result.returncode != 0:
+            logging.warning(f"afconvert failed for {path}, playing the original file: {result.stderr}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return path
+        os.replace(tmp_path, pcm_path)
+        for stale in glob.glob(os.path.join(self.cache_dir, f"{path_key}-*")):
+            if stale != pcm_path:
+                os.remove(stale)
+        return pcm_path
+
+    def load(self, path):
+        try:
+            clip = self._convert(path)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            logging.warning(f"Could not pre-decode {path}, playing the original file: {e}")
+            clip = path
+        with open(clip, 'rb') as f:
+            f.read()
+        return clip
+
+    def start(self, clip):
+        return runner.spawn(["afplay", clip], timeout=PLAYBACK_TIMEOUT)
+
+    def stop(self, handle):
+        handle.cancel()
+
+    def wait(self, handle, timeout=None):
+        return handle.wait(timeout)
+
+    def is_playing(self, handle):
+        return not handle.done()
+
+
+class AVFoundationBackend:
+    """Plays cues in-process with AVAudioPlayer, keeping the file contents in memory."""
+
+    def load(self, path):
+        data = NSData.dataWithContentsOfFile_(path)
+        if data is None:
+            raise OSError(f"Could not read {path}")
+        # Decode once up front so a bad file fails at preload time rather than at play time.
+        player, error = AVAudioPlayer.alloc().initWithData_error_(data, None)
+        if player is None or not player.prepareToPlay():
+            raise OSError(f"AVAudioPlayer could not load {path}: {error}")
+        return data
+
+    def start(self, clip):
+        # A single AVAudioPlayer can't overlap with itself, so each play gets its own player over the shared data.
+        player, error = AVAudioPlayer.alloc().initWithData_error_(clip, None)
+        if player is None or not player.play():
+            raise OSError(f"AVAudioPlayer could not start playback: {error}")
+        return player
+
+    def stop(self, handle):
+        handle.stop()
+
+    def wait(self, handle, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while handle.isPlaying():
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def is_playing(self, handle):
+        return bool(handle.isPlaying())
+
+
+def default_backend():
+    if AVAudioPlayer is not None:
+        return AVFoundationBackend()
+    return AfplayBackend()
+
+
+class Playback:
+    def __init__(self, player, name, handle, start_latency):
+        self.name = name
+        self.start_latency = start_latency
+        self._player = player
+        self._handle = handle
+
+    def wait(self, timeout=None):
+        finished = self._player.backend.wait(self._handle, timeout)
+        if finished:
+            self._player._forget(self)
+        return finished
+
+    def cancel(self):
+        logging.debug(f"Cancelling audio cue '{self.name}'.")
+        self._player.backend.stop(self._handle)
+        self._player._forget(self)
+
+    def is_playing(self):
+        return self._player.backend.is_playing(self._handle)
+
+
+class AudioCuePlayer:
+    def __init__(self, backend=None):
+        self.backend = backend or default_backend()
+        self.start_latencies = [] # Seconds from play() to the backend reporting playback started
+        self._cues = {}
+        self._active = []
+        self._lock = threading.Lock()
+
+    def preload(self, name, path):
+        if not path or not os.path.exists(path):
+            logging.warning(f"Audio cue '{name}' not loaded, file not found: {path}")
+            return False
+        try:
+            self._cues[name] = self.backend.load(path)
+        except OSError as e:
+            logging.error(f"Error preloading audio cue '{name}' from {path}: {e}")
+            return False
+        logging.debug(f"Preloaded audio cue '{name}' from {path}.")
+        return True
+
+    def has_cue(self, name):
+        return name in self._cues
+
+    def play(self, name):
+        clip = self._cues.get(name)
+        if clip is None:
+            logging.debug(f"Audio cue '{name}' is not loaded; nothing to play.")
+            return None
+        started = time.perf_counter()
+        try:
+            handle = self.backend.start(clip)
+        except OSError as e:
+            logging.error(f"Error starting audio cue '{name}': {e}")
+            return None
+        latency = time.perf_counter() - started
+        self.start_latencies.append(latency)
+        logging.info(f"Audio cue '{name}' started in {latency * 1000:.1f} ms.")
+        playback = Playback(self, name, handle, latency)
+        with self._lock:
+            self._active.append(playback)
+        return playback
+
+    def active(self):
+        with self._lock:
+            return [p for p in self._active if p.is_playing()]
+
+    def cancel_all(self):
+        with self._lock:
+            playing = list(self._active)
+        for playback in playing:
+            playback.cancel()
+
+    def wait_all(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            playing = list(self._active)
+        for playback in playing:
+            remaining = None if deadline is None else max(0, deadline - time.monotonic())
+            if not playback.wait(remaining):
+                return False
+        return True
+
+    def _forget(self, playback):
+        with self._lock:
+            if playback in self._active:
+                self._active.remove(playback)
+
+
+def load_cues_from_config(config, backend=None):
+    # "sound" is the original boot sound; "sounds" maps extra cue names to files.
+    player = AudioCuePlayer(backend)
+    player.preload(BOOTUP_CUE, config.get('sound'))
+    for name, path in config.get('sounds', {}).items():
+        player.preload(name, path)
+    return player
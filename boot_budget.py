@@ -0,0 +1,100 @@
+import time
+import logging
+import contextlib
+import subprocess
+
+import runner
+import metrics
+
+# Bounds how long boot may take. Non-essential stages get a deadline (their own timeout, capped by
+# what is left of the overall budget) that every runner.run() call inside them is clamped to; once
+# the budget is spent they are skipped outright. Essential stages (authentication) always run in full.
+
+STAGE_COMPLETED = 'completed'
+STAGE_CUT = 'cut' # Started but ran out of time
+STAGE_SKIPPED = 'skipped' # Budget already spent when the stage came up
+STAGE_ABORTED = 'aborted' # Raised or exited, e.g. failed verification
+STAGE_RESUMED = 'resumed' # Completed by an earlier boot that was interrupted (see boot_checkpoint)
+
+
+class BootBudget:
+    def __init__(self, total_seconds=None, stage_timeouts=None, announce=None, profiler=None, checkpoint=None):
+        self.total_seconds = total_seconds # None means no overall limit
+        self.stage_timeouts = dict(stage_timeouts or {})
+        self.announce = announce or (lambda message: None) # Spoken note when a stage is skipped or cut
+        self.profiler = profiler # A boot_profiler.BootProfiler in --profile mode
+        self.checkpoint = checkpoint # A boot_checkpoint.BootCheckpoint when resuming is enabled
+        self.started = time.monotonic()
+        self.stages = [] # (name, seconds, outcome) in the order they ran
+
+    def remaining(self):
+        if self.total_seconds is None:
+            return None
+        return self.total_seconds - (time.monotonic() - self.started)
+
+    def allowance(self, name):
+        # Seconds a non-essential stage may use, or None if nothing limits it
+        limits = [limit for limit in (self.stage_timeouts.get(name), self.remaining()) if limit is not None]
+        return min(limits) if limits else None
+
+    def run_stage(self, name, func, *args, essential=False, label=None, resumable=True, **kwargs):
+        # Runs func(*args, **kwargs) as the named stage and returns its result (None if skipped, cut or
+        # already completed by an interrupted boot). Stages with resumable=False always run.
+        label = label or name.replace('_', ' ')
+        checkpoint = self.checkpoint if resumable else None
+        if checkpoint and checkpoint.is_done(name):
+            logging.info(f"The {label} stage completed before the interruption; not repeating it.")
+            self._record(name, 0.0, STAGE_RESUMED)
+            return None
+        allowance = None if essential else self.allowance(name)
+        if allowance is not None and allowance <= 0:
+            logging.warning(f"Boot budget spent; skipping the {label} stage.")
+            self._record(name, 0.0, STAGE_SKIPPED)
+            self.announce(f"Skipping the {label} to stay within the boot time budget.")
+            return None
+
+        if checkpoint:
+            checkpoint.stage_started(name)
+        started = time.monotonic()
+        outcome = STAGE_ABORTED
+        try:
+            with self.profiler.stage(name) if self.profiler else contextlib.nullcontext():
+                if allowance is None:
+                    result = func(*args, **kwargs)
+                else:
+                    with runner.deadline(started + allowance):
+                        try:
+                            result = func(*args, **kwargs)
+                        except subprocess.TimeoutExpired as e:
+                            logging.warning(f"The {label} stage hit its deadline: {e}")
+                            result = None
+            elapsed = time.monotonic() - started
+            outcome = STAGE_CUT if allowance is not None and elapsed >= allowance else STAGE_COMPLETED
+        finally:
+            self._record(name, time.monotonic() - started, outcome)
+        if checkpoint:
+            checkpoint.stage_done(name)
+
+        if outcome == STAGE_CUT:
+            logging.warning(f"The {label} stage was cut after {allowance:.1f}s.")
+            self.announce(f"The {label} ran out of time and was cut short.")
+        return result
+
+    def _record(self, name, seconds, outcome):
+        self.stages.append((name, seconds, outcome))
+        metrics.set_gauge('jarvis_boot_stage_seconds', seconds, stage=name)
+        metrics.inc('jarvis_boot_stage_outcomes_total', stage=name, outcome=outcome)
+
+    def summary(self):
+        lines = [f"{name}: {seconds:.2f}s ({outcome})" for name, seconds, outcome in self.stages]
+        total = time.monotonic() - self.started
+        budget = "no limit" if self.total_seconds is None else f"budget {self.total_seconds}s"
+        cut = [name for name, _, outcome in self.stages if outcome in (STAGE_CUT, STAGE_SKIPPED)]
+        lines.append(f"total: {total:.2f}s ({budget}); cut or skipped: {', '.join(cut) or 'none'}")
+        if self.checkpoint and self.checkpoint.recovery_seconds is not None:
+            lines.append(f"recovered from interrupted boot in {self.checkpoint.recovery_seconds:.2f}s")
+        return lines
+
+    def log_summary(self):
+        for line in self.summary():
+            logging.info(f"Boot stage - {line}")
@@ -0,0 +1,98 @@
+import os
+import json
+import time
+import hashlib
+import logging
+
+import metrics
+from session_cache import SessionCache, write_private, machine_id, user_id
+
+# Crash-safe boot progress. Every stage is journaled when it starts and when it completes, so if the
+# process dies mid-boot (VLC crash, killed during app launch, power loss) the next run within the
+# validity window resumes at the first incomplete stage instead of starting over. The journal can
+# skip authentication, so it is signed with the session cache's key and bound to this machine, user
+# and config, exactly like a session token.
+
+CHECKPOINT_FILE = 'boot_checkpoint.json'
+
+
+def config_fingerprint(config):
+    return hashlib.sha256(json.dumps(config, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class BootCheckpoint:
+    def __init__(self, config, window_seconds, path=CHECKPOINT_FILE, signer=None):
+        self.window_seconds = window_seconds
+        self.path = path
+        self.signer = signer or SessionCache()
+        self.fingerprint = config_fingerprint(config)
+        self.opened_at = time.monotonic()
+        self.recovery_seconds = None # Set once a resumed boot reaches its first incomplete stage
+        self.completed = []
+        self.interrupted_stage = None # What was running when the previous boot died
+        self.started_at = time.time()
+        self._current = None
+        self._load()
+
+    @property
+    def resumed(self):
+        return bool(self.completed)
+
+    def _load(self):
+        try:
+            with open(self.path, 'r') as f:
+                journal = json.load(f)
+            if not self.signer.verify(journal["payload"], journal["mac"]):
+                logging.warning("Ignoring boot checkpoint: signature mismatch.")
+                return
+            state = json.loads(journal["payload"])
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            logging.warning(f"Ignoring unreadable boot checkpoint {self.path}: {e}")
+            return
+        if (state.get("machine"), state.get("user"), state.get("config")) != (machine_id(), user_id(), self.fingerprint):
+            logging.info("Boot checkpoint is for another machine, user or config; starting over.")
+            return
+        age = time.time() - state.get("updated_at", 0)
+        if not 0 <= age <= self.window_seconds:
+            logging.info(f"Boot checkpoint is {age:.0f}s old (window {self.window_seconds}s); starting over.")
+            return
+        self.completed = list(state.get("completed", []))
+        self.interrupted_stage = state.get("current")
+        self.started_at = state.get("started_at", self.started_at)
+        logging.info(f"Resuming interrupted boot: {', '.join(self.completed)} already done"
+                     f"{f', interrupted during {self.interrupted_stage}' if self.interrupted_stage else ''}.")
+
+    def _write(self):
+        payload = json.dumps({"machine": machine_id(), "user": user_id(), "config": self.fingerprint,
+                              "started_at": self.started_at, "updated_at": time.time(),
+                              "completed": self.completed, "current": self._current}, sort_keys=True)
+        try:
+            write_private(self.path, json.dumps({"payload": payload, "mac": self.signer.sign(payload)}).encode())
+        except OSError as e:
+            logging.error(f"Could not write boot checkpoint {self.path}: {e}")
+
+    def is_done(self, stage):
+        return stage in self.completed
+
+    def stage_started(self, stage):
+        if self.resumed and self.recovery_seconds is None:
+            self.recovery_seconds = time.monotonic() - self.opened_at
+            logging.info(f"Recovered from interrupted boot in {self.recovery_seconds:.2f}s; resuming at stage '{stage}'.")
+            metrics.set_gauge('jarvis_boot_recovery_seconds', self.recovery_seconds)
+        self._current = stage
+        self._write()
+
+    def stage_done(self, stage):
+        if stage not in self.completed:
+            self.completed.append(stage)
+        self._current = None
+        self._write()
+
+    def clear(self):
+        # Boot finished (or verification failed): the next run starts from the beginning
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
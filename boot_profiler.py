@@ -0,0 +1,171 @@
+import os
+import sys
+import glob
+import json
+import time
+import pstats
+import cProfile
+import logging
+import argparse
+import contextlib
+import tracemalloc
+
+import runner
+
+# `main.py --profile`: every boot stage runs under cProfile and tracemalloc. Each stage gets a JSON
+# report (plus the raw .prof) under profiles/<run id>/. The report splits wall time into in-process
+# CPU and time spent off-CPU, and shows how much of the latter was child processes run through runner.
+# `python boot_profiler.py diff <run A> <run B>` compares two runs stage by stage.
+
+PROFILE_DIR = 'profiles'
+TOP_FUNCTIONS = 25
+TOP_ALLOCATIONS = 10
+
+
+def _subprocess_seconds():
+    # Total run time of children per command so far (the runner's run_latency histograms)
+    return {name: s.run_latency.sum for name, s in runner.stats().items()}
+
+def _top_functions(profile, limit=TOP_FUNCTIONS):
+    rows = []
+    for (filename, line, function), (_, calls, own, cumulative, _) in pstats.Stats(profile).stats.items():
+        rows.append({'function': f"{os.path.basename(filename)}:{line}({function})", 'calls': calls,
+                     'own_seconds': round(own, 6), 'cumulative_seconds': round(cumulative, 6)})
+    rows.sort(key=lambda row: row['cumulative_seconds'], reverse=True)
+    return rows[:limit]
+
+def _top_allocations(snapshot, limit=TOP_ALLOCATIONS):
+    return [{'location': f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+             'size_bytes': stat.size, 'count': stat.count}
+            for stat in snapshot.statistics('lineno')[:limit]]
+
+
+class BootProfiler:
+    def __init__(self, output_dir=PROFILE_DIR, run_id=None):
+        self.run_id = run_id or time.strftime('%Y%m%d-%H%M%S')
+        self.run_dir = os.path.join(output_dir, self.run_id)
+        os.makedirs(self.run_dir, exist_ok=True)
+        self.reports = []
+
+    def record_startup(self):
+        # CPU spent before main() started: interpreter start-up and module imports (cv2, numpy, requests).
+        # Imports run before any profiler can be attached, so only the total is available.
+        cpu = time.process_time()
+        self._write({'stage': 'startup', 'wall_seconds': None, 'cpu_seconds': round(cpu, 6), 'off_cpu_seconds': None,
+                     'subprocess_seconds': 0.0, 'subprocess_by_command': {}, 'peak_memory_bytes': None,
+                     'top_functions': [], 'top_allocations': []})
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        owns_tracing = not tracemalloc.is_tracing()
+        if owns_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        subprocess_before = _subprocess_seconds()
+        profile = cProfile.Profile() # Profiles this thread only, i.e. the in-process side of the stage
+        wall_started, cpu_started = time.perf_counter(), time.process_time()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            wall = time.perf_counter() - wall_started
+            cpu = time.process_time() - cpu_started
+            _, peak = tracemalloc.get_traced_memory()
+            snapshot = tracemalloc.take_snapshot()
+            if owns_tracing:
+                tracemalloc.stop()
+            by_command = {command: round(seconds - subprocess_before.get(command, 0), 6)
+                          for command, seconds in _subprocess_seconds().items()
+                          if seconds != subprocess_before.get(command, 0)}
+            self._write({
+                'stage': name,
+                'wall_seconds': round(wall, 6),
+                'cpu_seconds': round(cpu, 6), # All threads of this process
+                'off_cpu_seconds': round(max(wall - cpu, 0), 6), # Waiting on children, the user, the network
+                'subprocess_seconds': round(sum(by_command.values()), 6), # Children may overlap, so this can exceed wall
+                'subprocess_by_command': by_command,
+                'peak_memory_bytes': peak - baseline,
+                'top_functions': _top_functions(profile),
+                'top_allocations': _top_allocations(snapshot), # Still allocated when the stage ended
+            }, profile)
+
+    def _write(self, report, profile=None):
+        self.reports.append(report)
+        path = os.path.join(self.run_dir, f"{len(self.reports):02d}-{report['stage']}")
+        with open(f"{path}.json", 'w') as f:
+            json.dump(report, f, indent=2)
+        if profile is not None:
+            profile.dump_stats(f"{path}.prof")
+        logging.info(f"Profile - {format_report(report)}")
+
+    def log_summary(self):
+        logging.info(f"Profile reports for {len(self.reports)} stage(s) written to {self.run_dir}")
+
+
+def _fmt(seconds):
+    return "-" if seconds is None else f"{seconds:.3f}s"
+
+def _fmt_bytes(size):
+    return "-" if size is None else f"{size / (1024 * 1024):.1f} MB"
+
+def format_report(report):
+    return (f"{report['stage']}: wall {_fmt(report['wall_seconds'])}, cpu {_fmt(report['cpu_seconds'])}, "
+            f"off-cpu {_fmt(report['off_cpu_seconds'])}, subprocess {_fmt(report['subprocess_seconds'])}, "
+            f"peak {_fmt_bytes(report['peak_memory_bytes'])}")
+
+def load_run(run_dir):
+    reports = {}
+    for path in sorted(glob.glob(os.path.join(run_dir, '*.json'))):
+        with open(path, 'r') as f:
+            report = json.load(f)
+        reports[report['stage']] = report
+    return reports
+
+def _delta(before, after):
+    if before is None or after is None:
+        return "-"
+    return f"{after - before:+.3f}"
+
+def diff_runs(run_a, run_b, top=5):
+    # Lines comparing two runs: per-stage time and memory, then the functions whose cumulative time moved most
+    a, b = load_run(run_a), load_run(run_b)
+    lines = []
+    for stage in list(a) + [s for s in b if s not in a]:
+        before, after = a.get(stage), b.get(stage)
+        if before is None or after is None:
+            lines.append(f"{stage}: only in {'B' if before is None else 'A'}")
+            continue
+        lines.append(f"{stage}: wall {_delta(before['wall_seconds'], after['wall_seconds'])}s, "
+                     f"cpu {_delta(before['cpu_seconds'], after['cpu_seconds'])}s, "
+                     f"subprocess {_delta(before['subprocess_seconds'], after['subprocess_seconds'])}s, "
+                     f"peak memory {_delta(before['peak_memory_bytes'], after['peak_memory_bytes'])} bytes")
+        times_a = {row['function']: row['cumulative_seconds'] for row in before['top_functions']}
+        times_b = {row['function']: row['cumulative_seconds'] for row in after['top_functions']}
+        changes = sorted(((times_b.get(fn, 0) - times_a.get(fn, 0), fn) for fn in set(times_a) | set(times_b)),
+                         key=lambda change: abs(change[0]), reverse=True)
+        for change, function in changes[:top]:
+            if change:
+                lines.append(f"    {change:+.3f}s {function}")
+    return lines
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Jarvis boot profile reports.")
+    subcommands = parser.add_subparsers(dest='command', required=True)
+    show = subcommands.add_parser('show', help="Summarise one run.")
+    show.add_argument('run')
+    diff = subcommands.add_parser('diff', help="Compare two runs stage by stage.")
+    diff.add_argument('run_a')
+    diff.add_argument('run_b')
+    args = parser.parse_args(argv)
+
+    if args.command == 'show':
+        lines = [format_report(report) for report in load_run(args.run).values()]
+    else:
+        lines = diff_runs(args.run_a, args.run_b)
+    print("\n".join(lines))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+import os
+import sys
+import json
+import logging
+import threading
+
+import cv2
+
+# Finds a working camera instead of assuming index 0. Candidate devices are probed concurrently (each
+# worker tries the capture backends for its device in turn, since opening one device through two
+# backends at once tends to fail with "device busy"). The first source to deliver a real frame wins
+# and is remembered in camera.json, so later boots open it directly and only re-probe if it stops working.
+
+CAMERA_CHOICE_FILE = 'camera.json'
+CAMERA_INDICES = (0, 1, 2)
+PROBE_TIMEOUT = 5 # Seconds
+FRAME_ATTEMPTS = 5 # Frames read before giving up on a source; cameras may return blank frames while warming up
+
+
+def default_backends():
+    if sys.platform == 'darwin':
+        return [cv2.CAP_AVFOUNDATION, cv2.CAP_ANY]
+    return [cv2.CAP_ANY]
+
+def valid_frame(frame):
+    # All-black frames come from virtual cameras with no feed and devices that aren't streaming yet
+    return frame is not None and frame.size > 0 and frame.any()
+
+def try_source(source, backend, opener=cv2.VideoCapture):
+    # Returns an open capture that has delivered a valid frame, or None
+    cap = opener(source, backend)
+    if cap.isOpened():
+        for _ in range(FRAME_ATTEMPTS):
+            ok, frame = cap.read()
+            if ok and valid_frame(frame):
+                return cap
+    cap.release()
+    return None
+
+def probe_cameras(sources, backends=None, timeout=PROBE_TIMEOUT, opener=cv2.VideoCapture):
+    # Returns (capture, source, backend) for the first source to deliver a frame within timeout, or None
+    if not sources:
+        return None
+    backends = backends or default_backends()
+    state = {'winner': None, 'closed': False, 'pending': len(sources)}
+    lock = threading.Lock()
+    settled = threading.Event() # A winner was found, or every probe gave up
+
+    def probe(source):
+        try:
+            for backend in backends:
+                if settled.is_set():
+                    return
+                try:
+                    cap = try_source(source, backend, opener)
+                except cv2.error as e:
+                    logging.debug(f"Camera probe {source} (backend {backend}) failed: {e}")
+                    continue
+                if cap is None:
+                    continue
+                with lock:
+                    if state['winner'] is None and not state['closed']:
+                        state['winner'] = (cap, source, backend)
+                        settled.set()
+                        return
+                cap.release() # Lost the race, or the caller already gave up
+                return
+        finally:
+            with lock:
+                state['pending'] -= 1
+                if state['pending'] == 0:
+                    settled.set()
+
+    # A stuck open can't be interrupted, so nothing waits for the workers: they are daemon threads (a pool's
+    # threads would be joined at exit, so a hung camera would keep the process alive) and late finishers
+    # release their capture
+    for source in sources:
+        threading.Thread(target=probe, args=(source,), name=f"jarvis-camera-probe-{source}", daemon=True).start()
+    settled.wait(timeout)
+    with lock:
+        state['closed'] = True
+        return state['winner']
+
+def load_choice(path=CAMERA_CHOICE_FILE):
+    try:
+        with open(path, 'r') as f:
+            choice = json.load(f)
+        return choice['source'], choice['backend']
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        logging.warning(f"Ignoring unreadable camera choice {path}: {e}")
+        return None
+
+def save_choice(source, backend, path=CAMERA_CHOICE_FILE):
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, 'w') as f:
+            json.dump({'source': source, 'backend': backend}, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logging.error(f"Could not remember camera choice in {path}: {e}")
+
+def open_camera(choice_path=CAMERA_CHOICE_FILE, sources=CAMERA_INDICES, backends=None, timeout=PROBE_TIMEOUT, opener=cv2.VideoCapture):
+    # An open capture that has delivered a frame, or None if no camera responded in time
+    choice = load_choice(choice_path)
+    if choice:
+        source, backend = choice
+        found = probe_cameras([source], [backend], timeout, opener) # Time-limited too, in case it was unplugged or hangs
+        if found is not None:
+            logging.debug(f"Opened remembered camera {source} (backend {backend}).")
+            return found[0]
+        logging.warning(f"Remembered camera {source} (backend {backend}) did not deliver a frame within {timeout}s; probing again.")
+
+    found = probe_cameras(list(sources), backends, timeout, opener)
+    if found is None:
+        logging.error(f"No camera among {list(sources)} delivered a frame within {timeout}s.")
+        return None
+    cap, source, backend = found
+    logging.info(f"Selected camera {source} (backend {backend}); remembering it in {choice_path}.")
+    save_choice(source, backend, choice_path)
+    return cap
@@ -0,0 +1,158 @@
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import subprocess
+import schedule
+import runner
+import metrics
+from notification_outbox import NotificationOutbox
+
+# Post-boot check-in duties. This module must stay light: it is what the process becomes after
+# boot in low-memory mode, so it never imports cv2, numpy, requests or main.
+
+PAUSE_FLAG = 'pause.flag'
+RSS_BEFORE_ENV = 'JARVIS_RSS_BEFORE_HANDOFF'
+NOTIFICATION_TIMEOUT = 10 # Seconds
+HANDOFF_FLUSH_TIMEOUT = 5 # Seconds to let the outbox drain before exec; the journal covers the rest
+
+_outbox = None
+
+def deliver_notification(title, message):
+    # Blocking delivery; the outbox calls this from its sender thread and retries on False
+    logging.debug(f"Attempting to send notification: Title='{title}', Message='{message}'")
+    try:
+        result = runner.run([
+            "osascript", "-e",
+            f'display notification "{message}" with title "{title}"'
+        ], timeout=NOTIFICATION_TIMEOUT)
+    except (OSError, subprocess.TimeoutExpired) as e:
+        logging.error(f"send_notification osascript error: {e}")
+        return False
+    if result.returncode != 0:
+        logging.error(f"send_notification osascript error: {result.stderr}")
+        return False
+    logging.debug(f"send_notification osascript success.")
+    return True
+
+def get_outbox():
+    global _outbox
+    if _outbox is None:
+        _outbox = NotificationOutbox(deliver_notification).start()
+    return _outbox
+
+def send_notification(title, message):
+    # Queue the notification and return at once; delivery and retries happen in the background
+    get_outbox().enqueue(title, message)
+
+def hourly_checkin(config): # Pass config to access message and user_name
+    metrics.inc('jarvis_checkin_runs_total')
+    if not os.path.exists(PAUSE_FLAG):
+        user_name = config.get('user_name', 'sir') # Get user_name for the message
+        default_message = f"Hi {user_name}, it’s Jarvis checking in. Never stop grinding."
+        message_template = config.get('hourly_checkin_message', default_message)
+        message = message_template.replace("{user_name}", user_name)
+        send_notification("Jarvis", message)
+    else:
+        logging.info("Hourly check-in skipped due to PAUSE_FLAG.")
+        metrics.inc('jarvis_checkin_skipped_total', reason='pause_flag')
+    runner.log_summary() # Keep per-command subprocess stats visible for the long-running process
+    if _outbox is not None:
+        logging.info(f"Notification outbox: {_outbox.summary()}")
+
+def start_hourly_checkins(config):
+    # Step 8: Hourly notifications begin
+    logging.info(f"Sending initial notification and scheduling hourly check-ins...")
+    send_notification("Jarvis", "Notifications will appear here every hour.")
+    schedule.every().hour.at(":00").do(hourly_checkin, config=config) # Pass config to hourly_checkin
+
+def run_scheduler_loop():
+    while True:
+        metrics.inc('jarvis_scheduler_wakeups_total')
+        schedule.run_pending()
+        time.sleep(1)
+
+def current_rss_bytes(pid=None):
+    # `ps` works the same on macOS and Linux and costs nothing to import
+    try:
+        result = runner.run(["ps", "-o", "rss=", "-p", str(pid or os.getpid())], timeout=5)
+        return int(result.stdout.strip()) * 1024 # ps reports KiB
+    except (OSError, ValueError, subprocess.TimeoutExpired) as e:
+        logging.warning(f"Could not measure RSS: {e}")
+        return None
+
+def outbox_collector():
+    if _outbox is None:
+        return
+    yield 'gauge', 'jarvis_notification_queue_depth', {}, _outbox.depth()
+    yield 'counter', 'jarvis_notifications_delivered_total', {}, _outbox.delivered
+    yield 'counter', 'jarvis_notification_retries_total', {}, _outbox.retries
+    yield 'counter', 'jarvis_notifications_dropped_total', {}, _outbox.dropped
+    yield 'counter', 'jarvis_notifications_coalesced_total', {}, _outbox.coalesced
+    yield 'histogram', 'jarvis_notification_delivery_seconds', {}, _outbox.delivery_latency
+
+def rss_collector():
+    rss = current_rss_bytes()
+    if rss is not None:
+        yield 'gauge', 'jarvis_resident_memory_bytes', {}, rss
+
+def start_metrics(config):
+    # Localhost-only Prometheus endpoint; off unless metrics_port is configured
+    port = config.get('metrics_port')
+    if not port:
+        return None
+    metrics.REGISTRY.add_collector(outbox_collector)
+    metrics.REGISTRY.add_collector(rss_collector)
+    try:
+        return metrics.start_server(port)
+    except OSError as e:
+        logging.error(f"Could not start metrics endpoint on port {port}: {e}")
+        return None
+
+def format_rss(rss_bytes):
+    return "unknown" if rss_bytes is None else f"{rss_bytes / (1024 * 1024):.1f} MB"
+
+def hand_off(config_path):
+    # Replace this (heavy) process image with a fresh interpreter running only this module.
+    # The PID is kept, so anything supervising Jarvis keeps tracking the same process.
+    rss_before = current_rss_bytes()
+    logging.info(f"Handing check-ins to the low-memory scheduler. RSS before hand-off: {format_rss(rss_before)}.")
+    env = dict(os.environ)
+    if rss_before is not None:
+        env[RSS_BEFORE_ENV] = str(rss_before)
+    env[metrics.GAUGES_ENV] = metrics.REGISTRY.export_gauges() # Boot stage timings survive the exec
+    if _outbox is not None and not _outbox.flush(HANDOFF_FLUSH_TIMEOUT):
+        logging.info(f"{_outbox.depth()} notification(s) still pending; the scheduler will resume them from the journal.")
+    sys.stdout.flush()
+    sys.stderr.flush()
+    os.execve(sys.executable, [sys.executable, os.path.abspath(__file__), "--config", os.path.abspath(config_path)], env)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Minimal Jarvis hourly check-in scheduler.")
+    parser.add_argument("--config", default='config.json', help="Path to config.json.")
+    args = parser.parse_args(argv)
+
+    with open(args.config, 'r') as f:
+        config = json.load(f)
+
+    rss_after = current_rss_bytes()
+    rss_before = os.environ.pop(RSS_BEFORE_ENV, None)
+    if rss_before is not None:
+        rss_before = int(rss_before)
+        logging.info(f"Low-memory scheduler running. RSS before hand-off: {format_rss(rss_before)}, "
+                     f"after: {format_rss(rss_after)}.")
+    else:
+        logging.info(f"Low-memory scheduler running. RSS: {format_rss(rss_after)}.")
+
+    exported_gauges = os.environ.pop(metrics.GAUGES_ENV, None)
+    if exported_gauges:
+        metrics.REGISTRY.import_gauges(exported_gauges)
+    start_metrics(config)
+    start_hourly_checkins(config)
+    run_scheduler_loop()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
+    main()
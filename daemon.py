@@ -0,0 +1,127 @@
+import os
+import sys
+import json
+import time
+import socket
+import logging
+import schedule
+
+import main as jarvis
+import runner
+import metrics
+from jarvis_client import SOCKET_PATH
+
+# Resident mode: this process pays for the cv2 import, cascade load, cue preloading and config parse
+# once, then runs the verify-and-launch sequence whenever jarvis_client.py asks for it.
+
+class JarvisDaemon:
+    def __init__(self, config_path=jarvis.CONFIG_FILE, socket_path=SOCKET_PATH):
+        self.config_path = config_path
+        self.socket_path = socket_path
+        self.config = {} # Updated in place so the scheduled check-in always sees the current config
+        self.resources = None
+        self._config_mtime = None
+        self._running = False
+        self._server = None
+
+    def warm(self):
+        # Re-parse the config and rebuild resources only when the file changed since the last activation
+        started = time.perf_counter()
+        mtime = os.path.getmtime(self.config_path)
+        if self.resources is None or mtime != self._config_mtime:
+            logging.info(f"Loading config and warming resources from {self.config_path}.")
+            self.config.clear()
+            self.config.update(jarvis.load_config(self.config_path))
+            self.resources = jarvis.prepare_resources(self.config)
+            self._config_mtime = mtime
+        return time.perf_counter() - started
+
+    def handle(self, request):
+        # Returns the response to send back and an optional action to run once the client is answered
+        command = request.get("command")
+        if command == "ping":
+            return {"ok": True, "pid": os.getpid()}, None
+        if command == "prepare":
+            return {"ok": True, "ready_seconds": self.warm()}, None
+        if command == "activate":
+            return {"ok": True, "ready_seconds": self.warm()}, self.activate
+        if command == "shutdown":
+            self._running = False
+            return {"ok": True}, None
+        return {"ok": False, "error": f"Unknown command: {command}"}, None
+
+    def activate(self):
+        logging.info("Activation requested; running boot sequence with warm resources.")
+        try:
+            jarvis.run_boot_sequence(self.config, self.resources)
+        except SystemExit:
+            # Failed verification exits a cold run; the daemon just waits for the next activation
+            logging.info("Boot sequence ended early (verification failed or was declined).")
+        except Exception as e:
+            logging.error(f"Error during boot sequence: {e}")
+        finally:
+            runner.log_summary()
+
+    def serve_client(self, conn):
+        action = None
+        with conn:
+            try:
+                with conn.makefile('r') as reader:
+                    request = json.loads(reader.readline() or "{}")
+                response, action = self.handle(request)
+            except (ValueError, OSError) as e:
+                response = {"ok": False, "error": str(e)}
+            try:
+                conn.sendall(json.dumps(response).encode() + b"\n")
+            except OSError as e:
+                logging.warning(f"Could not answer daemon client: {e}")
+        if action:
+            action()
+
+    def start(self):
+        self.warm()
+        if os.path.exists(self.socket_path):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.socket_path)
+                raise RuntimeError(f"Another Jarvis daemon is already listening on {self.socket_path}.")
+            except ConnectionRefusedError:
+                os.remove(self.socket_path) # Stale socket from a previous run
+            finally:
+                probe.close()
+        self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._server.bind(self.socket_path)
+        os.chmod(self.socket_path, 0o600) # Only the owning user may trigger activations
+        self._server.listen(1)
+        self._server.settimeout(1) # Wake up every second to run pending check-ins
+        self._running = True
+        logging.info(f"Jarvis daemon listening on {self.socket_path}.")
+
+    def serve_forever(self):
+        try:
+            while self._running:
+                try:
+                    conn, _ = self._server.accept()
+                except socket.timeout:
+                    metrics.inc('jarvis_scheduler_wakeups_total')
+                    schedule.run_pending()
+                    continue
+                conn.settimeout(None)
+                self.serve_client(conn)
+        finally:
+            self._server.close()
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+            logging.info("Jarvis daemon stopped.")
+
+def main():
+    daemon = JarvisDaemon()
+    daemon.start()
+    jarvis.start_metrics(daemon.config)
+    jarvis.start_hourly_checkins(daemon.config)
+    if "--activate" in sys.argv[1:]:
+        daemon.activate()
+    daemon.serve_forever()
+
+if __name__ == "__main__":
+    main()
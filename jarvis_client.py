@@ -0,0 +1,91 @@
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import statistics
+import subprocess
+import logging
+
+# Thin client for the resident daemon. Only the standard library is imported here so that
+# triggering an activation costs an interpreter start and a socket round trip, nothing more.
+
+SOCKET_PATH = os.path.expanduser('~/.jarvis-daemon.sock')
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# What a cold start pays before the first interactive step: interpreter start, cv2 import,
+# config parse, cascade load and cue preloading.
+COLD_START_SNIPPET = "import main; main.prepare_resources(main.load_config())"
+
+def send_command(command, socket_path=SOCKET_PATH, timeout=30):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path)
+        sock.sendall(json.dumps({"command": command}).encode() + b"\n")
+        with sock.makefile('r') as reader:
+            line = reader.readline()
+    if not line:
+        raise ConnectionError(f"Daemon closed the connection without answering '{command}'.")
+    return json.loads(line)
+
+def activate(socket_path=SOCKET_PATH):
+    try:
+        response = send_command("activate", socket_path)
+    except (FileNotFoundError, ConnectionRefusedError):
+        logging.warning("Jarvis daemon is not running. Falling back to a cold start.")
+        os.execv(sys.executable, [sys.executable, os.path.join(PROJECT_DIR, "main.py")])
+    except socket.timeout:
+        # The daemon serves one client at a time and runs the boot sequence inline
+        logging.error("Jarvis daemon is busy (most likely running an activation). Try again once it finishes.")
+        return 1
+    if not response.get("ok"):
+        logging.error(f"Daemon refused activation: {response.get('error')}")
+        return 1
+    logging.info(f"Activation accepted; resources ready in {response['ready_seconds'] * 1000:.1f} ms.")
+    return 0
+
+def benchmark(runs=5, socket_path=SOCKET_PATH):
+    cold = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-c", COLD_START_SNIPPET], cwd=PROJECT_DIR, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        cold.append(time.perf_counter() - started)
+
+    # The warm side includes this thin client's own interpreter start, which every activation pays too
+    warm = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, os.path.abspath(__file__), "--socket", socket_path, "--prepare"], check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        warm.append(time.perf_counter() - started)
+
+    cold_median, warm_median = statistics.median(cold), statistics.median(warm)
+    print(f"Cold activation (fresh process): median {cold_median * 1000:.1f} ms over {runs} runs")
+    print(f"Warm activation (client+daemon): median {warm_median * 1000:.1f} ms over {runs} runs")
+    print(f"Speed-up: {cold_median / warm_median:.0f}x")
+    return cold, warm
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Trigger the resident Jarvis daemon.")
+    parser.add_argument("--socket", default=SOCKET_PATH, help="Daemon socket path.")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--ping", action="store_true", help="Check that the daemon is alive.")
+    group.add_argument("--bench", type=int, metavar="RUNS", help="Compare warm and cold activation latency.")
+    group.add_argument("--shutdown", action="store_true", help="Stop the daemon.")
+    group.add_argument("--prepare", action="store_true", help=argparse.SUPPRESS) # Used by --bench
+    args = parser.parse_args(argv)
+
+    for flag in ("ping", "shutdown", "prepare"):
+        if getattr(args, flag):
+            print(json.dumps(send_command(flag, args.socket)))
+            return 0
+    if args.bench:
+        benchmark(args.bench, args.socket)
+        return 0
+    return activate(args.socket)
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    sys.exit(main())
@@ -1,61 +1,88 @@
 import os
 import subprocess
-import schedule
 import time
 import json
 from datetime import datetime
 import sys
-import threading
 import logging
+import contextlib
 import socket # For network check
 import requests # For fetching public IP
 import re # For MAC address pattern in network scan
 import cv2 # For facial recognition
+import audio_cues
+import camera_probe
+import runner
+import speech
+import metrics
+from boot_budget import BootBudget
+from boot_profiler import BootProfiler
+from session_cache import SessionCache
+from boot_checkpoint import BootCheckpoint
+from checkins import PAUSE_FLAG, send_notification, hourly_checkin, start_hourly_checkins, run_scheduler_loop, hand_off, start_metrics
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
 
 CONFIG_FILE = 'config.json'
-PAUSE_FLAG = 'pause.flag'
+# Per-call subprocess timeouts (seconds). Dialogs and media wait on the user, so they get generous limits.
+DIALOG_TIMEOUT = 600
+VIDEO_TIMEOUT = 900
+LAUNCH_TIMEOUT = 60
+ARP_TIMEOUT = 10
+RUNNING_APPS_TIMEOUT = 10
+IP_LOOKUP_TIMEOUT = 10
+# Overall boot budget and per-stage limits (seconds) for the stages that may be cut; config.json can override both
+DEFAULT_BOOT_BUDGET = 600
+DEFAULT_STAGE_TIMEOUTS = {'network': 30, 'video': 300, 'ip_lookup': 60}
+# Used when config.json doesn't set identity_name / identity_passphrase
+DEFAULT_IDENTITY_NAME = "Diego"
+DEFAULT_IDENTITY_PASSPHRASE = "iron man"
 
 def speak(message, voice=None):
+    # Sentence by sentence: audio starts as soon as the first sentence is ready, however long the message
     logging.debug(f"Attempting to speak: '{message}'")
-    cmd = ["say"]
-    if voice:
-        cmd.extend(["-v", voice])
-    cmd.append(message)
+    utterance = speech.Utterance(message, voice=voice)
+    started = time.perf_counter()
+    try:
+        spoken = utterance.run()
+    except (OSError, subprocess.TimeoutExpired) as e:
+        logging.error(f"speak command error: {e}")
+        metrics.inc('jarvis_speak_total', result='error')
+        return
+    finally:
+        metrics.observe('jarvis_speak_seconds', time.perf_counter() - started)
+    if utterance.first_audio_latency is not None:
+        metrics.observe('jarvis_speak_first_audio_seconds', utterance.first_audio_latency)
+    metrics.inc('jarvis_speak_total', result='ok' if spoken else 'incomplete')
+    if spoken:
+        logging.debug(f"speak command success.")
+
+def run_dialog(script, timeout=DIALOG_TIMEOUT):
+    # A dialog that can't be shown or times out is reported like a failed osascript run, so callers handle it as cancelled
+    cmd = ["osascript", "-e", script]
+    try:
+        return runner.run(cmd, timeout=timeout)
+    except (OSError, subprocess.TimeoutExpired) as e:
+        return subprocess.CompletedProcess(cmd, 1, "", str(e))
 
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    if result.returncode != 0:
-        logging.error(f"speak command error: {result.stderr}")
-    else:
-        logging.debug(f"speak command success (returncode 0).")
-
-def send_notification(title, message):
-    logging.debug(f"Attempting to send notification: Title='{title}', Message='{message}'")
-    result = subprocess.run([
-        "osascript", "-e",
-        f'display notification "{message}" with title "{title}"'
-    ], capture_output=True, text=True)
-    if result.returncode != 0:
-        logging.error(f"send_notification osascript error: {result.stderr}")
-    else:
-        logging.debug(f"send_notification osascript success.")
+def launch(cmd):
+    # Fire-and-forget `open`; the runner still reaps the child once it exits
+    try:
+        runner.spawn(cmd, timeout=LAUNCH_TIMEOUT)
+    except OSError as e:
+        logging.error(f"Failed to launch {cmd}: {e}")
 
 def show_initial_prompt():
     logging.debug("Showing initial prompt dialog.")
     # Display the dialog (this is blocking)
-    subprocess.run([
-        "osascript", "-e",
-        'display dialog "Ready to proceed?" buttons {"Continue"} default button 1 with title "Jarvis"'
-    ])
+    run_dialog('display dialog "Ready to proceed?" buttons {"Continue"} default button 1 with title "Jarvis"')
 
-def ask_for_password():
+def ask_for_password(expected_passphrase=DEFAULT_IDENTITY_PASSPHRASE):
     logging.debug("Asking for password...")
-    result = subprocess.run([
-        "osascript", "-e",
+    result = run_dialog(
         'display dialog "Please enter the passphrase to continue:" default answer "" with hidden answer buttons {"Continue"} default button 1 with title "Jarvis"'
-    ], capture_output=True, text=True)
+    )
 
     if result.returncode != 0:
         logging.error(f"ask_for_password osascript error: {result.stderr}")
@@ -67,16 +94,15 @@ def ask_for_password():
         if answer_line:
             password = answer_line[0].split("text returned:")[-1].strip()
             logging.debug(f"Password entered: '{password}'")
-            return password == "iron man"
+            return password == expected_passphrase
     logging.debug("Password check failed or dialog cancelled.")
     return False
 
-def ask_for_name(expected_name="Diego"):
+def ask_for_name(expected_name=DEFAULT_IDENTITY_NAME):
     logging.debug(f"Asking for name, expecting '{expected_name}'...")
-    result = subprocess.run([
-        "osascript", "-e", # Changed prompt text
+    result = run_dialog( # Changed prompt text
         'display dialog "Please state your name to confirm identity:" default answer "" buttons {"Confirm"} default button 1 with title "Jarvis Identity Check"'
-    ], capture_output=True, text=True)
+    )
 
     if result.returncode != 0:
         logging.error(f"ask_for_name osascript error: {result.stderr}")
@@ -92,10 +118,25 @@ def ask_for_name(expected_name="Diego"):
     logging.debug("Name check failed or dialog cancelled.")
     return False
 
+# Both prompts in one osascript run: one interpreter spawn, no pauses in between. Cancelling either
+# prompt aborts the script (error -128), which is reported like any other failed dialog.
+IDENTITY_DIALOG_SCRIPT = """
+set nameReply to display dialog "Please state your name to confirm identity:" default answer "" buttons {"Cancel", "Confirm"} default button "Confirm" with title "Jarvis Identity Check"
+set passReply to display dialog "Please enter the passphrase to continue:" default answer "" with hidden answer buttons {"Cancel", "Continue"} default button "Continue" with title "Jarvis Identity Check"
+return (text returned of nameReply) & linefeed & (text returned of passReply)
+"""
+
+def ask_for_identity():
+    # Returns (name, passphrase) stripped like the sequential dialogs, or None if the form was cancelled or failed
+    logging.debug("Asking for name and passphrase in one round trip...")
+    result = run_dialog(IDENTITY_DIALOG_SCRIPT)
+    if result.returncode != 0:
+        logging.error(f"ask_for_identity osascript error: {result.stderr}")
+        return None
 
-def play_bootup_sound(sound_path):
-    if sound_path and os.path.exists(sound_path):
-        subprocess.run(["afplay", sound_path])
+    entered_name, _, entered_passphrase = result.stdout.rstrip("\n").partition("\n")
+    logging.debug(f"Name entered: '{entered_name.strip()}'")
+    return entered_name.strip(), entered_passphrase.strip()
 
 def play_video_fullscreen(video_path, voice_for_errors=None):
     if not video_path or not os.path.exists(video_path):
@@ -107,20 +148,44 @@ def play_video_fullscreen(video_path, voice_for_errors=None):
         vlc_executable_path = "/Applications/VLC.app/Contents/MacOS/VLC"
         # Try with VLC for better fullscreen and play-and-exit behavior
         logging.debug("Trying to play with VLC...")
-        subprocess.run([vlc_executable_path, "--fullscreen", "--play-and-exit", video_path], check=True)
+        runner.run([vlc_executable_path, "--fullscreen", "--play-and-exit", video_path], timeout=VIDEO_TIMEOUT).check_returncode()
         logging.debug(f"VLC playback finished (using {vlc_executable_path}).")
     except FileNotFoundError:
         logging.warning("VLC not found. Falling back to QuickTime Player.")
         speak("VLC media player not found. Opening with QuickTime. Please close QuickTime to continue.", voice=voice_for_errors)
         # -W waits for the application to quit. Fullscreen might need manual activation.
-        subprocess.run(["open", "-W", "-a", "QuickTime Player", video_path])
-        logging.debug("QuickTime Player closed by user.")
+        try:
+            runner.run(["open", "-W", "-a", "QuickTime Player", video_path], timeout=VIDEO_TIMEOUT)
+            logging.debug("QuickTime Player closed by user.")
+        except subprocess.TimeoutExpired:
+            logging.error(f"QuickTime playback did not finish within {VIDEO_TIMEOUT}s; continuing.")
     except subprocess.CalledProcessError as e:
         logging.error(f"Error playing video with VLC: {e}")
         speak(f"Error playing video: {os.path.basename(video_path)}.", voice=voice_for_errors)
-
-def open_apps_and_folders(config, sound_thread_to_start=None):
-    apps_to_open = config.get('apps', [])
+    except subprocess.TimeoutExpired:
+        logging.error(f"VLC playback did not finish within {VIDEO_TIMEOUT}s and was stopped.")
+
+def running_apps(apps):
+    # Which of `apps` are running, in one osascript call. `is running` never launches the app, and the
+    # try blocks cover names AppleScript can't resolve.
+    lines = ["set runningApps to {}"]
+    for app in apps:
+        quoted = app.replace('"', '\\"')
+        lines += ["try", f'if application "{quoted}" is running then set end of runningApps to "{quoted}"', "end try"]
+    lines += ["set AppleScript's text item delimiters to linefeed", "return runningApps as text"]
+    result = run_dialog("\n".join(lines), timeout=RUNNING_APPS_TIMEOUT)
+    if result.returncode != 0:
+        logging.error(f"Could not check running applications: {result.stderr}")
+        return set()
+    return {line.strip() for line in result.stdout.splitlines() if line.strip()}
+
+def open_apps_and_folders(config, skip_running=False):
+    apps_to_open = list(config.get('apps', [])) # Copy: the daemon reuses config across activations
+    if skip_running and apps_to_open:
+        already_running = running_apps(apps_to_open)
+        if already_running:
+            logging.info(f"Already running, not launching again: {sorted(already_running)}")
+            apps_to_open = [app for app in apps_to_open if app not in already_running]
     arc_app = None
     if "Arc" in apps_to_open:
         apps_to_open.remove("Arc")
@@ -135,41 +200,30 @@ def open_apps_and_folders(config, sound_thread_to_start=None):
         default_button = '"Open Apps"'
 
         dialog_script = f'display dialog "{prompt_message}" buttons {buttons} default button {default_button} with title "Jarvis"'
-        result = subprocess.run(["osascript", "-e", dialog_script], capture_output=True, text=True)
+        result = run_dialog(dialog_script)
 
         if result.returncode == 0 and "button returned:Open Apps" in result.stdout:
             logging.info("User chose to open general apps and folders.")
-            if sound_thread_to_start and not sound_thread_to_start.is_alive():
-                logging.debug("Starting sound thread after 'Open Apps' confirmation.")
-                sound_thread_to_start.start()
             # Open non-Arc apps
             for app in apps_to_open:
                 logging.debug(f"Opening app: {app}")
-                subprocess.Popen(["open", "-a", app])
+                launch(["open", "-a", app])
             # Open folders
             for folder in general_folders:
                 logging.debug(f"Opening folder: {folder}")
-                subprocess.Popen(["open", folder])
+                launch(["open", folder])
         else:
             logging.info("User chose to skip or cancelled opening general apps and folders.")
-            # Start sound thread even if user skips opening general apps, but after their choice.
-            if sound_thread_to_start and not sound_thread_to_start.is_alive():
-                logging.debug("Starting sound thread after skipping/cancelling general apps.")
-                sound_thread_to_start.start()
             speak("Okay, skipping general applications and folders.", voice=config.get('voice'))
             if result.returncode != 0:
                 logging.error(f"Dialog error for general apps/folders: {result.stderr}")
-    elif sound_thread_to_start and not sound_thread_to_start.is_alive(): # If no general apps/folders to ask about
-        logging.debug("No general apps/folders to prompt for. Starting sound thread.")
-        sound_thread_to_start.start()
 
     # Open Arc last if it was specified and confirmed
     if arc_app:
         logging.debug(f"Prompting to open Arc...")
-        arc_result = subprocess.run([
-            "osascript", "-e",
+        arc_result = run_dialog(
             f'display dialog "Open {arc_app}?" buttons {{"Continue", "Cancel"}} default button "Continue" with title "Jarvis"'
-        ], capture_output=True, text=True)
+        )
 
         if arc_result.returncode != 0: # Corrected variable name here
             logging.error(f"Arc dialog osascript error: {arc_result.stderr}")
@@ -180,25 +234,15 @@ def open_apps_and_folders(config, sound_thread_to_start=None):
         logging.debug(f"Arc dialog stdout: {arc_result.stdout}")
         if "button returned:Continue" in arc_result.stdout:
             logging.debug(f"Opening Arc...")
-            subprocess.Popen(["open", "-a", arc_app])
+            launch(["open", "-a", arc_app])
         else:
             logging.debug(f"User chose not to open Arc.")
             speak(f"Okay, I will not open {arc_app}.", voice=config.get('voice'))
         time.sleep(1) # Pause after Arc interaction
 
 
-def hourly_checkin(config): # Pass config to access message and user_name
-    if not os.path.exists(PAUSE_FLAG):
-        user_name = config.get('user_name', 'sir') # Get user_name for the message
-        default_message = f"Hi {user_name}, it’s Jarvis checking in. Never stop grinding."
-        message_template = config.get('hourly_checkin_message', default_message)
-        message = message_template.replace("{user_name}", user_name)
-        send_notification("Jarvis", message)
-    else:
-        logging.info("Hourly check-in skipped due to PAUSE_FLAG.")
-
-def load_config(config_path=CONFIG_FILE):
-    with open(config_path, 'r') as f:
+def load_config(config_path=None):
+    with open(config_path or CONFIG_FILE, 'r') as f:
         return json.load(f)
 
 def check_internet_connection(host="8.8.8.8", port=53, timeout=3):
@@ -230,7 +274,7 @@ OUI_MANUFACTURERS = {
 def get_network_device_info():
     logging.debug("Attempting to get network device info using arp -a.")
     try:
-        result = subprocess.run(["arp", "-a"], capture_output=True, text=True, check=False, timeout=10)
+        result = runner.run(["arp", "-a"], timeout=ARP_TIMEOUT)
         if result.returncode != 0:
             logging.error(f"arp -a command failed. Stderr: {result.stderr}")
             return 0, {} # Return zero devices and empty manufacturer dict
@@ -249,24 +293,33 @@ def get_network_device_info():
                 manufacturers_found[manufacturer] = manufacturers_found.get(manufacturer, 0) + 1
 
         device_count = sum(manufacturers_found.values())
+        metrics.set_gauge('jarvis_network_devices', device_count)
+        for manufacturer, count in manufacturers_found.items():
+            metrics.set_gauge('jarvis_network_devices_by_manufacturer', count, manufacturer=manufacturer)
         logging.info(f"Detected {device_count} other devices. Manufacturers: {manufacturers_found}")
         return device_count, manufacturers_found
     except (FileNotFoundError, subprocess.TimeoutExpired, Exception) as e:
         logging.error(f"Error getting network device info: {e}")
         return 0, {}
 
-def perform_facial_scan(voice_for_errors=None, duration_seconds=5):
-    logging.info("Attempting facial scan...")
+def load_face_cascade():
     face_cascade_path = cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
     if not os.path.exists(face_cascade_path):
         logging.error(f"Haar cascade file not found at {face_cascade_path}. Facial scan cannot proceed.")
-        speak("Facial recognition module error. Cascade file missing.", voice=voice_for_errors)
-        return False # Or some other indicator of critical failure
+        return None
+    return cv2.CascadeClassifier(face_cascade_path)
 
-    face_cascade = cv2.CascadeClassifier(face_cascade_path)
-    cap = cv2.VideoCapture(0) # 0 is usually the default webcam
+def perform_facial_scan(voice_for_errors=None, duration_seconds=5, face_cascade=None):
+    logging.info("Attempting facial scan...")
+    if face_cascade is None: # Not preloaded by the caller
+        face_cascade = load_face_cascade()
+        if face_cascade is None:
+            speak("Facial recognition module error. Cascade file missing.", voice=voice_for_errors)
+            return False # Or some other indicator of critical failure
+
+    cap = camera_probe.open_camera() # The remembered camera, or the first of the candidates to deliver a frame
 
-    if not cap.isOpened():
+    if cap is None:
         logging.error("Cannot open webcam for facial scan.")
         speak("Unable to access webcam for facial scan.", voice=voice_for_errors)
         return False
@@ -296,18 +349,19 @@ def perform_facial_scan(voice_for_errors=None, duration_seconds=5):
         logging.debug("Webcam released.")
     return face_detected
 
-def main():
-    logging.info("Main function started.")
-    config = load_config()
-    
-    voice_to_use = config.get('voice')
-    # Step 1: Show initial prompt
-    speak("Initiating identity verification sequence.", voice=voice_to_use)
-    time.sleep(1)
+def prepare_resources(config):
+    # Everything that can be readied before the user is involved. The daemon keeps these warm between activations.
+    # The webcam is deliberately not included: holding it open would keep the camera light on.
+    return {
+        'face_cascade': load_face_cascade(),
+        # Preload audio cues up front so playback later starts without touching the disk
+        'cue_player': audio_cues.load_cues_from_config(config),
+    }
 
-    # Actual Facial Recognition
+def verify_face(config, resources):
+    voice_to_use = config.get('voice')
     facial_scan_duration = config.get('facial_scan_duration_seconds', 5) # Default to 5 if not in config
-    if perform_facial_scan(voice_for_errors=voice_to_use, duration_seconds=facial_scan_duration):
+    if perform_facial_scan(voice_for_errors=voice_to_use, duration_seconds=facial_scan_duration, face_cascade=resources['face_cascade']):
         speak("Facial scan successful. Primary user profile detected.", voice=voice_to_use)
     else:
         speak("Facial scan failed or no face detected. Access denied.", voice=voice_to_use)
@@ -315,31 +369,54 @@ def main():
         sys.exit()
     time.sleep(1) # Pause after facial scan result
 
-    # Ask for Name (moved before password)
-    if not ask_for_name("Diego"): # Hardcoded name "Diego" as requested
-        speak("Name verification failed. Identity not confirmed. Access denied.", voice=voice_to_use)
-        time.sleep(3)
-        sys.exit()
-    logging.info("Name verification successful.")
-    time.sleep(1) # Pause after name success
-
-    show_initial_prompt()
-    logging.info("Initial prompt dialog acknowledged.")
-    time.sleep(1) # Pause after initial prompt
-    
-    # Ask for password
-    if not ask_for_password():
-        speak("Incorrect passphrase. Unauthorized access attempt detected. Counter-measures initiated. We are coming for you.", voice=voice_to_use)
-        time.sleep(3) # Dramatic pause
-        sys.exit()
-    logging.info("Password correct.")
-    time.sleep(1) # Pause after password success
-
-    # New: Network Connectivity Check (after successful password)
+def verify_identity(config):
+    voice_to_use = config.get('voice')
+    expected_name = config.get('identity_name', DEFAULT_IDENTITY_NAME)
+    expected_passphrase = config.get('identity_passphrase', DEFAULT_IDENTITY_PASSPHRASE)
+    identity_started = time.perf_counter()
+    if config.get('combined_identity_dialog', False):
+        identity_flow = "combined"
+        identity = ask_for_identity()
+        entered_name, entered_passphrase = identity if identity else (None, None)
+        if entered_name is None or entered_name.lower() != expected_name.lower():
+            speak("Name verification failed. Identity not confirmed. Access denied.", voice=voice_to_use)
+            time.sleep(3)
+            sys.exit()
+        if entered_passphrase != expected_passphrase:
+            speak("Incorrect passphrase. Unauthorized access attempt detected. Counter-measures initiated. We are coming for you.", voice=voice_to_use)
+            time.sleep(3) # Dramatic pause
+            sys.exit()
+        logging.info("Name and password verified.")
+    else:
+        identity_flow = "sequential"
+        # Ask for Name (moved before password)
+        if not ask_for_name(expected_name):
+            speak("Name verification failed. Identity not confirmed. Access denied.", voice=voice_to_use)
+            time.sleep(3)
+            sys.exit()
+        logging.info("Name verification successful.")
+        time.sleep(1) # Pause after name success
+
+        show_initial_prompt()
+        logging.info("Initial prompt dialog acknowledged.")
+        time.sleep(1) # Pause after initial prompt
+
+        # Ask for password
+        if not ask_for_password(expected_passphrase):
+            speak("Incorrect passphrase. Unauthorized access attempt detected. Counter-measures initiated. We are coming for you.", voice=voice_to_use)
+            time.sleep(3) # Dramatic pause
+            sys.exit()
+        logging.info("Password correct.")
+        time.sleep(1) # Pause after password success
+    # Logged for both flows so the two can be compared across runs
+    logging.info(f"Identity verification ({identity_flow}) took {time.perf_counter() - identity_started:.2f}s.")
+
+def report_network_status(config):
+    voice_to_use = config.get('voice')
     logging.info("Performing network connectivity check...")
     perform_scan = config.get("perform_network_scan", False) # Default to False if not in config
 
-    if check_internet_connection():
+    if check_internet_connection(timeout=max(runner.time_left(3), 0.1)): # socket timeouts must be positive
         speak("Network status: Connected and secure.", voice=voice_to_use)
         if perform_scan:
             speak("Identifying what other devices are connected to your network.", voice=voice_to_use)
@@ -365,30 +442,30 @@ def main():
 
     time.sleep(1) # Pause after network check message
 
-
-    # Step 3: Play startup video if configured
+def play_startup_video(config):
     video_path = config.get('startup_video_path')
     if video_path and os.path.exists(video_path):
-        play_video_fullscreen(video_path, voice_to_use)
+        play_video_fullscreen(video_path, config.get('voice'))
         time.sleep(1) # Pause after video playback
 
-    # Step 4: Start Iron Man sound in a background thread
-    logging.debug("Starting sound thread.")
-    sound_thread = threading.Thread(target=play_bootup_sound, args=(config.get('sound'),))
-    # Sound thread will be started within open_apps_and_folders
+def launch_workspace(config, cue_player, skip_running=False):
+    # Start Iron Man sound, it plays alongside the app launch prompts
+    logging.debug("Playing bootup cue.")
+    cue_player.play(audio_cues.BOOTUP_CUE)
 
-    # Step 4: Launch apps and folders at the same time
+    # Launch apps and folders at the same time
     logging.debug("Opening apps and folders...")
-    open_apps_and_folders(config, sound_thread_to_start=sound_thread)
+    open_apps_and_folders(config, skip_running=skip_running)
     logging.info("Finished opening apps and folders.")
     # A small pause is already added within open_apps_and_folders after Arc interaction if applicable
 
-    # Step 6: Wait for sound to finish
-    logging.debug("Waiting for sound thread to join...")
-    sound_thread.join()
-    logging.debug("Sound thread joined.")
+    # Wait for sound to finish
+    logging.debug("Waiting for audio cues to finish...")
+    cue_player.wait_all()
+    logging.debug("Audio cues finished.")
 
-    # Step 6: Final motivational greeting with graduation countdown
+def greet(config):
+    # Final motivational greeting with graduation countdown
     today = datetime.now()
     graduation_date_str = "2026-05-29" # As requested
     try:
@@ -402,19 +479,21 @@ def main():
     user_name = config.get('user_name', 'sir') # Get user_name from config, default to 'sir'
     logging.debug(f"Speaking final greeting...")
     time.sleep(1) # Pause before final greeting
-    speak(f"Welcome home {user_name}. {countdown_message} Another day, another opportunity.", voice=voice_to_use)
-    
-    # Offer to show user's public IP
+    speak(f"Welcome home {user_name}. {countdown_message} Another day, another opportunity.", voice=config.get('voice'))
+
+def offer_public_ip(config):
+    voice_to_use = config.get('voice')
     logging.debug("Asking user if they want to see their public IP.")
     ip_dialog_script = 'display dialog "Would you like to see your current public IP?" buttons {"Yes", "No"} default button "No" with title "Jarvis"'
-    ip_result = subprocess.run(["osascript", "-e", ip_dialog_script], capture_output=True, text=True)
+    ip_result = run_dialog(ip_dialog_script)
 
     if ip_result.returncode != 0:
         logging.error(f"IP address dialog osascript error: {ip_result.stderr}")
     elif "button returned:Yes" in ip_result.stdout:
         logging.info("User chose to see public IP.")
         try:
-            ip_address = requests.get('https://api.ipify.org', timeout=10).text
+            # requests rejects a zero timeout, so keep a sliver even if the stage deadline is nearly up
+            ip_address = requests.get('https://api.ipify.org', timeout=max(runner.time_left(IP_LOOKUP_TIMEOUT), 0.1)).text
             logging.debug(f"Fetched public IP: {ip_address}")
             send_notification("Your IP Address", ip_address)
             speak(f"Your public IP address is {ip_address}", voice=voice_to_use)
@@ -427,14 +506,79 @@ def main():
     else:
         logging.info("User cancelled IP address dialog or unknown button.")
 
-    # Step 8: Hourly notifications begin
-    logging.info(f"Sending initial notification and scheduling hourly check-ins...")
-    send_notification("Jarvis", "Notifications will appear here every hour.")
-    schedule.every().hour.at(":00").do(hourly_checkin, config=config) # Pass config to hourly_checkin
-    while True:
-        schedule.run_pending()
-        time.sleep(1)
-    
+def make_boot_budget(config, profiler=None, checkpoint=None):
+    stage_timeouts = dict(DEFAULT_STAGE_TIMEOUTS)
+    stage_timeouts.update(config.get('stage_timeouts', {}))
+    return BootBudget(
+        total_seconds=config.get('boot_budget_seconds', DEFAULT_BOOT_BUDGET),
+        stage_timeouts=stage_timeouts,
+        announce=lambda message: speak(message, voice=config.get('voice')),
+        profiler=profiler,
+        checkpoint=checkpoint,
+    )
+
+def run_boot_sequence(config, resources, profiler=None):
+    voice_to_use = config.get('voice')
+    resume_window = config.get('resume_window_seconds', 0)
+    checkpoint = BootCheckpoint(config, resume_window) if resume_window else None
+    budget = make_boot_budget(config, profiler, checkpoint)
+    resuming = bool(checkpoint and checkpoint.resumed)
+    try:
+        session_ttl = config.get('session_ttl_seconds', 0)
+        if resuming:
+            speak("Resuming the interrupted start-up.", voice=voice_to_use)
+        if resuming and checkpoint.is_done('identity'):
+            logging.info("Identity was verified before the interruption; not asking again.")
+        elif session_ttl and budget.run_stage('session', SessionCache().is_valid, essential=True, resumable=False):
+            logging.info("Valid session token found; skipping facial scan and identity dialogs.")
+            speak("Welcome back. Identity already verified.", voice=voice_to_use)
+        else:
+            speak("Initiating identity verification sequence.", voice=voice_to_use)
+            time.sleep(1)
+
+            # Authentication is essential: never skipped or cut, whatever the budget says
+            budget.run_stage('facial_scan', verify_face, config, resources, essential=True)
+            budget.run_stage('identity', verify_identity, config, essential=True)
+            if session_ttl:
+                SessionCache().issue(session_ttl)
+
+        budget.run_stage('network', report_network_status, config, label="network check")
+        budget.run_stage('video', play_startup_video, config, label="startup video")
+        # After a crash some apps may already be open again; don't launch them twice
+        budget.run_stage('apps', launch_workspace, config, resources['cue_player'], resuming, essential=True)
+        budget.run_stage('greeting', greet, config, essential=True)
+        budget.run_stage('ip_lookup', offer_public_ip, config, label="IP address lookup")
+        if checkpoint:
+            checkpoint.clear() # Boot finished; the next run starts from the top
+    except SystemExit:
+        if checkpoint:
+            checkpoint.clear() # Failed verification must never be resumed past
+        raise
+    finally:
+        budget.log_summary()
+    return budget
+
+def main():
+    logging.info("Main function started.")
+    profiler = None
+    if "--profile" in sys.argv[1:]:
+        profiler = BootProfiler()
+        profiler.record_startup()
+    config = load_config()
+    start_metrics(config)
+    with profiler.stage('prepare') if profiler else contextlib.nullcontext():
+        resources = prepare_resources(config)
+    try:
+        run_boot_sequence(config, resources, profiler)
+    finally:
+        runner.log_summary()
+        if profiler:
+            profiler.log_summary()
+    if config.get('low_memory_checkins', False):
+        # Boot is done; drop OpenCV, NumPy, requests and the boot state by becoming the minimal scheduler
+        hand_off(CONFIG_FILE)
+    start_hourly_checkins(config)
+    run_scheduler_loop()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,149 @@
+import json
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import runner
+
+# Process metrics in Prometheus text format, served on 127.0.0.1 only. Stdlib-only so the
+# low-memory scheduler can serve them too. Values are either recorded as they happen
+# (inc/set_gauge/observe) or read at scrape time from collectors (subprocess stats, outbox, RSS).
+
+METRICS_HOST = '127.0.0.1'
+GAUGES_ENV = 'JARVIS_METRIC_GAUGES' # Carries recorded gauges (boot stages, scan results) across the low-memory hand-off
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in sorted(labels.items())) + '}'
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples = {} # name -> (kind, {labels tuple: value or Histogram})
+        self._collectors = [] # Callables yielding (kind, name, labels, value) at scrape time
+
+    def _series(self, kind, name):
+        series = self._samples.setdefault(name, (kind, {}))
+        if series[0] != kind:
+            raise ValueError(f"Metric {name} is a {series[0]}, not a {kind}")
+        return series[1]
+
+    def inc(self, name, value=1, **labels):
+        with self._lock:
+            series = self._series('counter', name)
+            key = tuple(sorted(labels.items()))
+            series[key] = series.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        with self._lock:
+            self._series('gauge', name)[tuple(sorted(labels.items()))] = value
+
+    def observe(self, name, value, **labels):
+        with self._lock:
+            series = self._series('histogram', name)
+            series.setdefault(tuple(sorted(labels.items())), runner.Histogram()).observe(value)
+
+    def add_collector(self, collector):
+        with self._lock:
+            if collector not in self._collectors:
+                self._collectors.append(collector)
+
+    def export_gauges(self):
+        with self._lock:
+            return json.dumps([[name, dict(labels), value] for name, (kind, series) in self._samples.items()
+                               if kind == 'gauge' for labels, value in series.items()])
+
+    def import_gauges(self, exported):
+        for name, labels, value in json.loads(exported):
+            self.set(name, value, **labels)
+
+    def _collect(self):
+        with self._lock:
+            merged = {name: (kind, dict(series)) for name, (kind, series) in self._samples.items()}
+            collectors = list(self._collectors)
+        for collector in collectors:
+            try:
+                for kind, name, labels, value in collector():
+                    merged.setdefault(name, (kind, {}))[1][tuple(sorted(labels.items()))] = value
+            except Exception as e:
+                logging.error(f"Metrics collector {getattr(collector, '__name__', collector)} failed: {e}")
+        return merged
+
+    def render(self):
+        lines = []
+        for name, (kind, series) in sorted(self._collect().items()):
+            lines.append(f"# TYPE {name} {kind}")
+            for key, value in sorted(series.items()):
+                labels = dict(key)
+                if kind != 'histogram':
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+                    continue
+                for bound, count in value.cumulative():
+                    lines.append(f"{name}_bucket{_format_labels(dict(labels, le=_format_value(bound)))} {count}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(value.sum)}")
+                lines.append(f"{name}_count{_format_labels(labels)} {value.count}")
+        return "\n".join(lines) + "\n"
+
+
+def subprocess_collector():
+    for command, s in sorted(runner.stats().items()):
+        labels = {'command': command}
+        yield 'counter', 'jarvis_subprocess_started_total', labels, s.started
+        yield 'counter', 'jarvis_subprocess_succeeded_total', labels, s.succeeded
+        yield 'counter', 'jarvis_subprocess_failed_total', labels, s.failed
+        yield 'counter', 'jarvis_subprocess_timed_out_total', labels, s.timed_out
+        yield 'counter', 'jarvis_subprocess_cancelled_total', labels, s.cancelled
+        yield 'histogram', 'jarvis_subprocess_spawn_seconds', labels, s.spawn_latency
+        yield 'histogram', 'jarvis_subprocess_run_seconds', labels, s.run_latency
+
+
+REGISTRY = Registry()
+REGISTRY.add_collector(subprocess_collector)
+
+def inc(name, value=1, **labels):
+    REGISTRY.inc(name, value, **labels)
+
+def set_gauge(name, value, **labels):
+    REGISTRY.set(name, value, **labels)
+
+def observe(name, value, **labels):
+    REGISTRY.observe(name, value, **labels)
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    registry = REGISTRY
+
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = self.registry.render().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logging.debug(f"Metrics request: {format % args}")
+
+
+def start_server(port, registry=REGISTRY):
+    # Serves /metrics from a daemon thread on localhost. Port 0 picks a free port (see server.server_address).
+    handler = type('BoundMetricsHandler', (MetricsHandler,), {'registry': registry})
+    server = ThreadingHTTPServer((METRICS_HOST, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="jarvis-metrics", daemon=True).start()
+    logging.info(f"Metrics available at http://{METRICS_HOST}:{server.server_address[1]}/metrics")
+    return server
@@ -0,0 +1,159 @@
+import os
+import json
+import time
+import uuid
+import logging
+import threading
+
+import runner
+
+# Notifications are queued here and delivered by a background thread, so callers never wait on
+# osascript. Pending entries are journaled to disk and picked up again after a restart (or after
+# the low-memory hand-off re-execs the process). Like checkins.py, this module stays light.
+
+OUTBOX_JOURNAL = 'notification_outbox.json'
+MAX_ATTEMPTS = 5
+BASE_BACKOFF = 2.0 # Seconds; doubles after every failed attempt
+MAX_BACKOFF = 60.0
+
+
+class NotificationOutbox:
+    def __init__(self, deliver, journal_path=OUTBOX_JOURNAL, max_attempts=MAX_ATTEMPTS,
+                 base_backoff=BASE_BACKOFF, max_backoff=MAX_BACKOFF):
+        self.deliver = deliver # deliver(title, message) -> True on success
+        self.journal_path = journal_path
+        self.max_attempts = max_attempts
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.delivered = 0
+        self.dropped = 0 # Gave up after max_attempts
+        self.retries = 0
+        self.coalesced = 0
+        self.delivery_latency = runner.Histogram() # Enqueue to successful delivery, seconds
+        self._pending = self._load_journal()
+        self._in_flight = None
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopping = False
+
+    def _load_journal(self):
+        if not os.path.exists(self.journal_path):
+            return []
+        try:
+            with open(self.journal_path, 'r') as f:
+                pending = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.error(f"Could not read notification journal {self.journal_path}, starting empty: {e}")
+            return []
+        if pending:
+            logging.info(f"Recovered {len(pending)} pending notification(s) from {self.journal_path}.")
+        return pending
+
+    def _write_journal(self):
+        # Called with the lock held. Write-then-rename so a crash never leaves a half-written journal.
+        entries = self._pending + ([self._in_flight] if self._in_flight else [])
+        tmp_path = f"{self.journal_path}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(entries, f)
+            os.replace(tmp_path, self.journal_path)
+        except OSError as e:
+            logging.error(f"Could not write notification journal {self.journal_path}: {e}")
+
+    def start(self):
+        with self._cond:
+            if self._thread is None:
+                self._stopping = False
+                self._thread = threading.Thread(target=self._run, name="jarvis-outbox", daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self, timeout=5):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+            thread, self._thread = self._thread, None
+        if thread:
+            thread.join(timeout)
+
+    def enqueue(self, title, message):
+        # Returns immediately. An identical notification that is still waiting is not queued twice.
+        with self._cond:
+            for entry in self._pending:
+                if entry['title'] == title and entry['message'] == message:
+                    self.coalesced += 1
+                    logging.debug(f"Coalesced duplicate notification: Title='{title}'")
+                    return entry['id']
+            now = time.time()
+            entry = {'id': uuid.uuid4().hex, 'title': title, 'message': message,
+                     'enqueued_at': now, 'attempts': 0, 'next_attempt_at': now}
+            self._pending.append(entry)
+            self._write_journal()
+            self._cond.notify_all()
+            return entry['id']
+
+    def depth(self):
+        with self._cond:
+            return len(self._pending) + (1 if self._in_flight else 0)
+
+    def flush(self, timeout=None):
+        # Wait until everything queued so far has been delivered or dropped; True if the outbox drained
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._pending or self._in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def _next_due(self):
+        # Called with the lock held: the entry to send now, or None and how long to sleep
+        if not self._pending:
+            return None, None
+        entry = min(self._pending, key=lambda e: e['next_attempt_at'])
+        wait = entry['next_attempt_at'] - time.time()
+        return (entry, None) if wait <= 0 else (None, wait)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    if self._stopping:
+                        return
+                    entry, wait = self._next_due()
+                    if entry:
+                        break
+                    self._cond.wait(wait)
+                self._pending.remove(entry)
+                self._in_flight = entry
+
+            try:
+                ok = self.deliver(entry['title'], entry['message'])
+            except Exception as e:
+                logging.error(f"Notification delivery raised: {e}")
+                ok = False
+
+            with self._cond:
+                self._in_flight = None
+                entry['attempts'] += 1
+                if ok:
+                    self.delivered += 1
+                    self.delivery_latency.observe(time.time() - entry['enqueued_at'])
+                elif entry['attempts'] >= self.max_attempts:
+                    self.dropped += 1
+                    logging.error(f"Dropping notification '{entry['title']}' after {entry['attempts']} failed attempts.")
+                else:
+                    self.retries += 1
+                    backoff = min(self.base_backoff * 2 ** (entry['attempts'] - 1), self.max_backoff)
+                    entry['next_attempt_at'] = time.time() + backoff
+                    logging.warning(f"Notification '{entry['title']}' failed (attempt {entry['attempts']}); retrying in {backoff:.0f}s.")
+                    self._pending.append(entry)
+                self._write_journal()
+                self._cond.notify_all()
+
+    def summary(self):
+        latency = self.delivery_latency
+        mean_ms = latency.sum / latency.count * 1000 if latency.count else 0
+        return (f"depth {self.depth()}, {self.delivered} delivered, {self.retries} retries, {self.dropped} dropped, "
+                f"{self.coalesced} coalesced; mean delivery latency {mean_ms:.1f} ms")
@@ -0,0 +1,238 @@
+import os
+import time
+import asyncio
+import logging
+import threading
+import contextlib
+import subprocess
+import concurrent.futures
+
+# Every child process Jarvis starts goes through here. Commands run on one asyncio loop in a
+# background thread, so callers stay synchronous while we get per-call timeouts, a global
+# concurrency cap, guaranteed reaping and per-command latency metrics in one place.
+
+DEFAULT_TIMEOUT = 60 # Seconds
+MAX_CONCURRENT = 8 # Children being spawned or run to completion by run(); spawned jobs only hold a slot while starting
+SPAWN_WAIT = 30 # Seconds spawn() waits for a free slot and the exec before giving up
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300) # Seconds, upper bounds
+
+
+_local = threading.local() # Per-thread deadline set by deadline()
+
+
+@contextlib.contextmanager
+def deadline(at):
+    # Until the block exits, run() calls made from this thread finish by `at` (a time.monotonic() value).
+    # Nested deadlines can only tighten the outer one.
+    previous = getattr(_local, 'deadline', None)
+    _local.deadline = at if previous is None else min(at, previous)
+    try:
+        yield
+    finally:
+        _local.deadline = previous
+
+def time_left(timeout=None):
+    # `timeout` shortened to this thread's deadline, if one is set. Can be <= 0 once the deadline has passed.
+    at = getattr(_local, 'deadline', None)
+    if at is None:
+        return timeout
+    left = at - time.monotonic()
+    return left if timeout is None else min(timeout, left)
+
+
+def _decode(data):
+    return data.decode('utf-8', errors='replace') if data is not None else None
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1) # Last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self):
+        # (upper bound, observations <= bound) pairs, ending with +Inf, as Prometheus expects
+        total, pairs = 0, []
+        for bound, count in zip(list(self.buckets) + [float('inf')], self.counts):
+            total += count
+            pairs.append((bound, total))
+        return pairs
+
+
+class CommandStats:
+    def __init__(self):
+        self.started = 0
+        self.succeeded = 0
+        self.failed = 0 # Non-zero exit or could not be spawned
+        self.timed_out = 0
+        self.cancelled = 0
+        self.spawn_latency = Histogram()
+        self.run_latency = Histogram()
+
+
+class Job:
+    """A process started with spawn(). It is always waited on by the runner, so it never becomes a zombie."""
+
+    def __init__(self, cmd, future, settled):
+        self.cmd = cmd
+        self._future = future
+        self._settled = settled # Set once the process has exited and been reaped
+
+    def done(self):
+        return self._settled.is_set()
+
+    def wait(self, timeout=None):
+        # True once the process has exited and been reaped, False if still running after timeout
+        return self._settled.wait(timeout)
+
+    def result(self, timeout=None):
+        return self._future.result(timeout)
+
+    def cancel(self, timeout=5):
+        # The future's cancel is forwarded to the task on the loop, which kills and reaps the process;
+        # wait for that so the child is really gone when we return.
+        self._future.cancel()
+        return self._settled.wait(timeout)
+
+
+class Runner:
+    def __init__(self, max_concurrent=MAX_CONCURRENT):
+        self.max_concurrent = max_concurrent
+        self.stats = {}
+        self._loop = None
+        self._semaphore = None
+        self._lock = threading.Lock()
+
+    def _ensure_loop(self):
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._semaphore = asyncio.Semaphore(self.max_concurrent)
+                thread = threading.Thread(target=self._loop.run_forever, name="jarvis-runner", daemon=True)
+                thread.start()
+        return self._loop
+
+    def _stats_for(self, cmd):
+        name = os.path.basename(cmd[0])
+        with self._lock:
+            return self.stats.setdefault(name, CommandStats())
+
+    async def _execute(self, cmd, timeout, capture_output, started=None, settled=None):
+        # `started`/`settled` are only passed by spawn(): a spawned job gives its slot back once it is
+        # running, so long-lived children (a 5 minute sound) can't starve later launches.
+        stats = self._stats_for(cmd)
+        pipe = asyncio.subprocess.PIPE if capture_output else asyncio.subprocess.DEVNULL
+        try:
+            await self._semaphore.acquire()
+            holding = True
+            try:
+                t0 = time.perf_counter()
+                try:
+                    proc = await asyncio.create_subprocess_exec(*cmd, stdout=pipe, stderr=pipe)
+                except OSError as e:
+                    stats.failed += 1
+                    if started:
+                        started.set_exception(e)
+                    raise
+                stats.started += 1
+                stats.spawn_latency.observe(time.perf_counter() - t0)
+                if started:
+                    self._semaphore.release()
+                    holding = False
+                    started.set_result(proc.pid)
+                try:
+                    stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout)
+                except asyncio.TimeoutError:
+                    stats.timed_out += 1
+                    await self._kill(proc)
+                    logging.warning(f"Command timed out after {timeout}s and was killed: {cmd[0]}")
+                    raise subprocess.TimeoutExpired(cmd, timeout)
+                except asyncio.CancelledError:
+                    stats.cancelled += 1
+                    await self._kill(proc)
+                    raise
+                finally:
+                    stats.run_latency.observe(time.perf_counter() - t0)
+            finally:
+                if holding:
+                    self._semaphore.release()
+        finally:
+            if settled:
+                settled.set()
+        if proc.returncode == 0:
+            stats.succeeded += 1
+        else:
+            stats.failed += 1
+        return subprocess.CompletedProcess(cmd, proc.returncode, _decode(stdout), _decode(stderr))
+
+    async def _kill(self, proc):
+        if proc.returncode is None:
+            try:
+                proc.kill()
+            except ProcessLookupError:
+                pass
+        await proc.wait() # Reap
+
+    def run(self, cmd, timeout=DEFAULT_TIMEOUT, capture_output=True):
+        # Blocking call with the same result shape as subprocess.run(..., capture_output=True, text=True).
+        # Raises FileNotFoundError if the command doesn't exist and subprocess.TimeoutExpired on timeout.
+        timeout = time_left(timeout)
+        if timeout is not None and timeout <= 0:
+            self._stats_for(cmd).timed_out += 1
+            raise subprocess.TimeoutExpired(cmd, 0) # Deadline already passed; don't start anything
+        loop = self._ensure_loop()
+        future = asyncio.run_coroutine_threadsafe(self._execute(cmd, timeout, capture_output), loop)
+        return future.result()
+
+    def spawn(self, cmd, timeout=None, capture_output=False, wait=SPAWN_WAIT):
+        # Starts a process without waiting for it; returns once it has been spawned.
+        # Raises FileNotFoundError if the command doesn't exist and TimeoutError if no slot frees up in time.
+        loop = self._ensure_loop()
+        started = concurrent.futures.Future()
+        settled = threading.Event()
+        future = asyncio.run_coroutine_threadsafe(self._execute(cmd, timeout, capture_output, started, settled), loop)
+        try:
+            started.result(wait) # Re-raises spawn errors such as FileNotFoundError
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            logging.error(f"Could not start {cmd[0]} within {wait}s; all {self.max_concurrent} subprocess slots are busy.")
+            raise TimeoutError(f"Timed out waiting to spawn {cmd[0]}")
+        return Job(cmd, future, settled)
+
+    def summary(self):
+        with self._lock:
+            items = sorted(self.stats.items())
+        lines = []
+        for name, s in items:
+            mean_spawn = s.spawn_latency.sum / s.spawn_latency.count * 1000 if s.spawn_latency.count else 0
+            mean_run = s.run_latency.sum / s.run_latency.count * 1000 if s.run_latency.count else 0
+            lines.append(f"{name}: {s.started} started, {s.succeeded} ok, {s.failed} failed, {s.timed_out} timed out, "
+                         f"{s.cancelled} cancelled; mean spawn {mean_spawn:.1f} ms, mean run {mean_run:.1f} ms")
+        return lines
+
+
+_default_runner = Runner()
+
+def run(cmd, timeout=DEFAULT_TIMEOUT, capture_output=True):
+    return _default_runner.run(cmd, timeout=timeout, capture_output=capture_output)
+
+def spawn(cmd, timeout=None, capture_output=False):
+    return _default_runner.spawn(cmd, timeout=timeout, capture_output=capture_output)
+
+def stats():
+    return _default_runner.stats
+
+def log_summary():
+    for line in _default_runner.summary():
+        logging.info(f"Subprocess stats - {line}")
@@ -0,0 +1,101 @@
+import os
+import hmac
+import json
+import time
+import uuid
+import socket
+import getpass
+import hashlib
+import logging
+
+# Remembers a successful verification for a short while, so a restart (after a crash, or a manual
+# re-run) doesn't repeat the facial scan and dialogs. The token is HMAC-signed with a per-user random
+# key and bound to this machine and user. Both files are 0600: anyone who can read them is already
+# the user, so this guards against tampering and copied tokens, not against the account itself.
+
+SESSION_PATH = os.path.expanduser("~/.jarvis-session")
+KEY_PATH = os.path.expanduser("~/.jarvis-session.key")
+
+
+def machine_id():
+    return f"{socket.gethostname()}:{uuid.getnode():012x}"
+
+def user_id():
+    return f"{os.getuid()}:{getpass.getuser()}"
+
+def write_private(path, data):
+    # Create with 0600 from the start (no window where it is readable), then swap in atomically
+    tmp_path = f"{path}.tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+    os.chmod(tmp_path, 0o600) # O_CREAT's mode is ignored if the tmp file already existed
+    os.replace(tmp_path, path)
+
+def _is_private(path):
+    st = os.stat(path)
+    return st.st_uid == os.getuid() and not st.st_mode & 0o077
+
+
+class SessionCache:
+    def __init__(self, path=SESSION_PATH, key_path=KEY_PATH):
+        self.path = path
+        self.key_path = key_path
+
+    def _key(self):
+        if os.path.exists(self.key_path):
+            if not _is_private(self.key_path):
+                raise PermissionError(f"{self.key_path} must be owned by you and not readable by others.")
+            with open(self.key_path, 'rb') as f:
+                return f.read()
+        key = os.urandom(32)
+        write_private(self.key_path, key)
+        return key
+
+    def sign(self, payload):
+        return hmac.new(self._key(), payload.encode(), hashlib.sha256).hexdigest()
+
+    def verify(self, payload, mac):
+        return isinstance(mac, str) and hmac.compare_digest(mac, self.sign(payload))
+
+    def issue(self, ttl_seconds):
+        now = time.time()
+        payload = json.dumps({"machine": machine_id(), "user": user_id(), "issued_at": now,
+                              "expires_at": now + ttl_seconds}, sort_keys=True)
+        try:
+            write_private(self.path, json.dumps({"payload": payload, "mac": self.sign(payload)}).encode())
+        except OSError as e:
+            logging.error(f"Could not store session token at {self.path}: {e}")
+            return False
+        logging.info(f"Session token issued, valid for {ttl_seconds}s.")
+        return True
+
+    def is_valid(self):
+        # True only for an untampered, unexpired token issued on this machine for this user
+        try:
+            if not _is_private(self.path):
+                logging.warning(f"Ignoring session token {self.path}: permissions are too open.")
+                return False
+            with open(self.path, 'r') as f:
+                token = json.load(f)
+            payload = token["payload"]
+            if not self.verify(payload, token["mac"]):
+                logging.warning("Ignoring session token: signature mismatch.")
+                return False
+            claims = json.loads(payload)
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            logging.warning(f"Ignoring unreadable session token {self.path}: {e}")
+            return False
+        if claims.get("machine") != machine_id() or claims.get("user") != user_id():
+            logging.warning("Ignoring session token issued for another machine or user.")
+            return False
+        now = time.time()
+        return claims.get("issued_at", now + 1) <= now < claims.get("expires_at", 0)
+
+    def clear(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,156 @@
+import os
+import re
+import time
+import uuid
+import shutil
+import weakref
+import logging
+import tempfile
+import threading
+import subprocess
+import concurrent.futures
+
+import runner
+
+# Sentence-level speech. The first sentence is spoken live by `say` straight away; meanwhile the
+# next sentence is rendered to a file, so it is ready by the time the current one finishes. Time to
+# first audio therefore no longer grows with message length, and an utterance can be cancelled
+# between or during sentences.
+
+SPEAK_TIMEOUT = 120 # Seconds, per sentence
+SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+
+def split_sentences(text):
+    return [sentence for sentence in (part.strip() for part in SENTENCE_END.split(text.strip())) if sentence]
+
+
+class SaySynthesizer:
+    """macOS `say` for synthesis, `afplay` for pre-rendered sentences. Every process goes through runner."""
+
+    def __init__(self, workdir=None):
+        self.workdir = workdir
+        if workdir is None:
+            # Our own scratch directory for rendered clips; removed when the synthesizer goes away or at exit
+            self.workdir = tempfile.mkdtemp(prefix="jarvis-speech-")
+            self.cleanup = weakref.finalize(self, shutil.rmtree, self.workdir, ignore_errors=True)
+
+    def _voice_args(self, voice):
+        return ["-v", voice] if voice else []
+
+    def say(self, sentence, voice=None):
+        return runner.spawn(["say", *self._voice_args(voice), sentence], timeout=SPEAK_TIMEOUT)
+
+    def render(self, sentence, voice=None):
+        # Returns (clip, job); the clip can be played once the job has finished
+        clip = os.path.join(self.workdir, f"{uuid.uuid4().hex}.aiff")
+        return clip, runner.spawn(["say", *self._voice_args(voice), "-o", clip, sentence], timeout=SPEAK_TIMEOUT)
+
+    def play(self, clip):
+        return runner.spawn(["afplay", clip], timeout=SPEAK_TIMEOUT)
+
+    def discard(self, clip):
+        try:
+            os.remove(clip)
+        except OSError:
+            pass
+
+
+_default_synthesizer = None
+
+def default_synthesizer():
+    global _default_synthesizer
+    if _default_synthesizer is None:
+        _default_synthesizer = SaySynthesizer()
+    return _default_synthesizer
+
+
+class Utterance:
+    def __init__(self, text, voice=None, synthesizer=None):
+        self.sentences = split_sentences(text)
+        self.voice = voice
+        self.synthesizer = synthesizer or default_synthesizer()
+        self.first_audio_latency = None # Seconds from run() until the first sentence started
+        self._cancelled = threading.Event()
+        self._jobs = set()
+        self._lock = threading.Lock()
+
+    def cancel(self):
+        # Safe to call from any thread: stops whatever is playing or rendering and speaks nothing further
+        self._cancelled.set()
+        self._stop_jobs()
+
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def _stop_jobs(self):
+        with self._lock:
+            jobs, self._jobs = list(self._jobs), set()
+        for job in jobs:
+            job.cancel()
+
+    def _track(self, job):
+        with self._lock:
+            self._jobs.add(job)
+        if self._cancelled.is_set(): # cancel() may have run before the job was registered
+            job.cancel()
+        return job
+
+    def _finish(self, job, sentence):
+        # Wait for a job within SPEAK_TIMEOUT (or the caller's runner deadline, if sooner).
+        # True if it succeeded; False if it failed or the utterance was cancelled.
+        timeout = runner.time_left(SPEAK_TIMEOUT)
+        if not job.wait(max(timeout, 0)):
+            self._stop_jobs()
+            raise subprocess.TimeoutExpired(job.cmd, timeout)
+        with self._lock:
+            self._jobs.discard(job)
+        if self._cancelled.is_set():
+            return False
+        try:
+            result = job.result(0)
+        except concurrent.futures.CancelledError:
+            return False
+        if result.returncode != 0:
+            logging.error(f"Speech failed for sentence '{sentence}' ({job.cmd[0]} exited {result.returncode}).")
+            return False
+        return True
+
+    def _render(self, index, clips):
+        if index >= len(self.sentences) or self._cancelled.is_set():
+            return None
+        clip, job = self.synthesizer.render(self.sentences[index], self.voice)
+        clips.append(clip)
+        return clip, self._track(job)
+
+    def run(self):
+        # Blocks until every sentence was spoken (True), or the utterance failed or was cancelled (False).
+        # Raises OSError if a command can't be started and subprocess.TimeoutExpired on timeout.
+        started = time.perf_counter()
+        if not self.sentences or self._cancelled.is_set():
+            return False
+        clips = []
+        try:
+            current = self._track(self.synthesizer.say(self.sentences[0], self.voice))
+            self.first_audio_latency = time.perf_counter() - started
+            upcoming = self._render(1, clips) # Sentence 2 renders while sentence 1 is spoken
+            if not self._finish(current, self.sentences[0]):
+                return False
+            for index in range(1, len(self.sentences)):
+                if upcoming is None: # Cancelled before it could be rendered
+                    return False
+                clip, render_job = upcoming
+                if not self._finish(render_job, self.sentences[index]):
+                    return False
+                upcoming = self._render(index + 1, clips) # Sentence N+1 renders while sentence N plays
+                if not self._finish(self._track(self.synthesizer.play(clip)), self.sentences[index]):
+                    return False
+            return True
+        finally:
+            self._stop_jobs() # e.g. a render still in flight after a failure or cancel
+            for clip in clips:
+                self.synthesizer.discard(clip)
+
+
+def speak(text, voice=None, synthesizer=None):
+    return Utterance(text, voice, synthesizer).run()
@@ -0,0 +1,140 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import os
+import tempfile
+
+import audio_cues
+
+
+class FakeBackend:
+    def __init__(self):
+        self.loaded = []
+        self.started = []
+        self.stopped = []
+        self.finished = set()
+
+    def load(self, path):
+        self.loaded.append(path)
+        return f"clip:{path}"
+
+    def start(self, clip):
+        handle = (clip, len(self.started))
+        self.started.append(handle)
+        return handle
+
+    def stop(self, handle):
+        self.stopped.append(handle)
+        self.finished.add(handle)
+
+    def wait(self, handle, timeout=None):
+        return handle in self.finished
+
+    def is_playing(self, handle):
+        return handle not in self.finished
+
+
+class TestAudioCuePlayer(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.sound_path = os.path.join(self.tmpdir.name, "boot.wav")
+        with open(self.sound_path, 'wb') as f:
+            f.write(b"RIFF")
+        self.backend = FakeBackend()
+        self.player = audio_cues.AudioCuePlayer(self.backend)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_preload_loads_once_and_plays_from_memory(self):
+        self.assertTrue(self.player.preload("bootup", self.sound_path))
+        self.player.play("bootup")
+        self.player.play("bootup")
+        self.assertEqual(self.backend.loaded, [self.sound_path])
+        self.assertEqual(len(self.backend.started), 2)
+        self.assertEqual(len(self.player.start_latencies), 2)
+
+    def test_preload_missing_file(self):
+        self.assertFalse(self.player.preload("bootup", os.path.join(self.tmpdir.name, "missing.wav")))
+        self.assertFalse(self.player.has_cue("bootup"))
+        self.assertIsNone(self.player.play("bootup"))
+        self.assertEqual(self.backend.started, [])
+
+    def test_overlapping_playbacks_and_cancel(self):
+        self.player.preload("bootup", self.sound_path)
+        first = self.player.play("bootup")
+        second = self.player.play("bootup")
+        self.assertEqual(self.player.active(), [first, second])
+
+        first.cancel()
+        self.assertEqual(self.player.active(), [second])
+        self.player.cancel_all()
+        self.assertEqual(self.player.active(), [])
+        self.assertEqual(len(self.backend.stopped), 2)
+
+    def test_wait_all_reports_unfinished(self):
+        self.player.preload("bootup", self.sound_path)
+        playback = self.player.play("bootup")
+        self.assertFalse(self.player.wait_all(timeout=0))
+        self.backend.finished.add(playback._handle)
+        self.assertTrue(self.player.wait_all(timeout=0))
+        self.assertEqual(self.player.active(), [])
+
+    def test_start_error_is_logged_not_raised(self):
+        self.player.preload("bootup", self.sound_path)
+        with patch.object(self.backend, 'start', side_effect=FileNotFoundError("afplay")):
+            self.assertIsNone(self.player.play("bootup"))
+
+    def test_load_cues_from_config(self):
+        config = {"sound": self.sound_path, "sounds": {"alert": self.sound_path}}
+        player = audio_cues.load_cues_from_config(config, backend=self.backend)
+        self.assertTrue(player.has_cue(audio_cues.BOOTUP_CUE))
+        self.assertTrue(player.has_cue("alert"))
+
+
+class TestAfplayBackend(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.sound_path = os.path.join(self.tmpdir.name, "boot.mp3")
+        with open(self.sound_path, 'wb') as f:
+            f.write(b"ID3")
+        self.cache_dir = os.path.join(self.tmpdir.name, "cues")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def fake_afconvert(self, cmd, timeout):
+        with open(cmd[-1], 'wb') as f:
+            f.write(b"RIFF")
+        return MagicMock(returncode=0)
+
+    @patch('runner.run')
+    def test_load_predecodes_to_pcm(self, mock_run):
+        mock_run.side_effect = self.fake_afconvert
+        clip = audio_cues.AfplayBackend(self.cache_dir).load(self.sound_path)
+        self.assertTrue(clip.endswith("boot.mp3.wav"))
+        self.assertEqual(os.path.dirname(clip), self.cache_dir)
+        self.assertEqual(mock_run.call_args[0][0][:5], ["afconvert", "-f", "WAVE", "-d", "LEI16"])
+
+    @patch('runner.run')
+    def test_conversion_is_reused_until_the_source_changes(self, mock_run):
+        mock_run.side_effect = self.fake_afconvert
+        first = audio_cues.AfplayBackend(self.cache_dir).load(self.sound_path)
+        self.assertEqual(audio_cues.AfplayBackend(self.cache_dir).load(self.sound_path), first)
+        self.assertEqual(mock_run.call_count, 1)
+
+        stat = os.stat(self.sound_path)
+        os.utime(self.sound_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+        second = audio_cues.AfplayBackend(self.cache_dir).load(self.sound_path)
+        self.assertNotEqual(second, first)
+        self.assertEqual(mock_run.call_count, 2)
+        self.assertEqual(os.listdir(self.cache_dir), [os.path.basename(second)]) # Stale copy removed
+
+    @patch('runner.run', side_effect=FileNotFoundError("afconvert"))
+    def test_load_falls_back_to_original_file(self, mock_run):
+        self.assertEqual(audio_cues.AfplayBackend(self.cache_dir).load(self.sound_path), self.sound_path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+from unittest.mock import MagicMock
+
+import runner
+import boot_budget
+
+
+class TestBootBudget(unittest.TestCase):
+
+    def test_stage_runs_and_is_recorded(self):
+        budget = boot_budget.BootBudget(total_seconds=60)
+        self.assertEqual(budget.run_stage('network', lambda x: x * 2, 21), 42)
+        self.assertEqual(budget.stages[0][0], 'network')
+        self.assertEqual(budget.stages[0][2], boot_budget.STAGE_COMPLETED)
+
+    def test_spent_budget_skips_non_essential_stage_with_note(self):
+        announce = MagicMock()
+        budget = boot_budget.BootBudget(total_seconds=0, announce=announce)
+        func = MagicMock()
+        with self.assertLogs(level='WARNING'):
+            self.assertIsNone(budget.run_stage('video', func, label="startup video"))
+        func.assert_not_called()
+        self.assertEqual(budget.stages, [('video', 0.0, boot_budget.STAGE_SKIPPED)])
+        announce.assert_called_once_with("Skipping the startup video to stay within the boot time budget.")
+
+    def test_essential_stage_runs_even_when_budget_spent(self):
+        budget = boot_budget.BootBudget(total_seconds=0)
+        func = MagicMock(return_value=True)
+        self.assertTrue(budget.run_stage('identity', func, essential=True))
+        func.assert_called_once()
+        self.assertEqual(budget.stages[0][2], boot_budget.STAGE_COMPLETED)
+
+    def test_stage_timeout_cuts_hung_subprocess(self):
+        announce = MagicMock()
+        budget = boot_budget.BootBudget(stage_timeouts={'video': 0.3}, announce=announce)
+        with self.assertLogs(level='WARNING'):
+            budget.run_stage('video', runner.run, ["sleep", "30"], label="startup video")
+        name, seconds, outcome = budget.stages[0]
+        self.assertEqual(outcome, boot_budget.STAGE_CUT)
+        self.assertLess(seconds, 5)
+        announce.assert_called_once_with("The startup video ran out of time and was cut short.")
+
+    def test_aborted_stage_is_recorded_and_reraised(self):
+        budget = boot_budget.BootBudget(total_seconds=60)
+        with self.assertRaises(SystemExit):
+            budget.run_stage('facial_scan', lambda: exit(), essential=True)
+        self.assertEqual(budget.stages[0][2], boot_budget.STAGE_ABORTED)
+
+    def test_summary_lists_cut_stages(self):
+        budget = boot_budget.BootBudget(total_seconds=0)
+        with self.assertLogs(level='WARNING'):
+            budget.run_stage('ip_lookup', MagicMock())
+        self.assertIn("cut or skipped: ip_lookup", budget.summary()[-1])
+
+
+if __name__ == '__main__':
+    unittest.main()
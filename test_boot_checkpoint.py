@@ -0,0 +1,95 @@
+import unittest
+from unittest.mock import MagicMock
+import os
+import json
+import stat
+import tempfile
+
+import boot_budget
+import boot_checkpoint
+import session_cache
+
+
+class TestBootCheckpoint(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "checkpoint.json")
+        self.signer = session_cache.SessionCache(path=os.path.join(self.tmpdir.name, "session"),
+                                                 key_path=os.path.join(self.tmpdir.name, "session.key"))
+        self.config = {"apps": ["Spotify"]}
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def checkpoint(self, config=None, window=900):
+        return boot_checkpoint.BootCheckpoint(config or self.config, window, path=self.path, signer=self.signer)
+
+    def crash_after_network(self):
+        first = self.checkpoint()
+        budget = boot_budget.BootBudget(checkpoint=first)
+        budget.run_stage('identity', lambda: True, essential=True)
+        budget.run_stage('network', lambda: None)
+        with self.assertRaises(RuntimeError):
+            budget.run_stage('video', MagicMock(side_effect=RuntimeError("VLC crashed")))
+
+    def test_fresh_boot_is_not_resumed(self):
+        checkpoint = self.checkpoint()
+        self.assertFalse(checkpoint.resumed)
+        self.assertFalse(checkpoint.is_done('identity'))
+
+    def test_restart_resumes_at_first_incomplete_stage(self):
+        self.crash_after_network()
+        self.assertEqual(stat.S_IMODE(os.stat(self.path).st_mode), 0o600)
+
+        with self.assertLogs(level='INFO') as logs:
+            checkpoint = self.checkpoint()
+        self.assertIn("interrupted during video", "\n".join(logs.output))
+        self.assertEqual(checkpoint.completed, ['identity', 'network'])
+        identity, video = MagicMock(), MagicMock(return_value="played")
+        budget = boot_budget.BootBudget(checkpoint=checkpoint)
+        self.assertIsNone(budget.run_stage('identity', identity, essential=True))
+        self.assertEqual(budget.run_stage('video', video), "played")
+        identity.assert_not_called()
+        self.assertEqual(budget.stages[0][2], boot_budget.STAGE_RESUMED)
+        self.assertIsNotNone(checkpoint.recovery_seconds)
+        self.assertIn("recovered from interrupted boot in", budget.summary()[-1])
+
+    def test_non_resumable_stage_always_runs(self):
+        self.crash_after_network()
+        budget = boot_budget.BootBudget(checkpoint=self.checkpoint())
+        network = MagicMock(return_value=True)
+        self.assertTrue(budget.run_stage('network', network, resumable=False))
+        network.assert_called_once()
+
+    def test_expired_checkpoint_starts_over(self):
+        self.crash_after_network()
+        with self.assertLogs(level='INFO'):
+            self.assertFalse(self.checkpoint(window=0.000001).resumed)
+
+    def test_changed_config_starts_over(self):
+        self.crash_after_network()
+        with self.assertLogs(level='INFO'):
+            self.assertFalse(self.checkpoint(config={"apps": ["Arc"]}).resumed)
+
+    def test_tampered_checkpoint_is_ignored(self):
+        first = self.checkpoint()
+        first.stage_done('facial_scan')
+        with open(self.path) as f:
+            journal = json.load(f)
+        state = json.loads(journal["payload"])
+        state["completed"].append("identity")
+        journal["payload"] = json.dumps(state, sort_keys=True)
+        with open(self.path, 'w') as f:
+            json.dump(journal, f)
+        with self.assertLogs(level='WARNING'):
+            self.assertFalse(self.checkpoint().is_done('identity'))
+
+    def test_clear(self):
+        self.crash_after_network()
+        self.checkpoint().clear()
+        self.assertFalse(self.checkpoint().resumed)
+
+
+if __name__ == '__main__':
+    unittest.main()
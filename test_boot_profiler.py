@@ -0,0 +1,84 @@
+import unittest
+from unittest.mock import patch
+import io
+import os
+import tempfile
+
+import runner
+import boot_budget
+import boot_profiler
+
+
+def busy(seconds):
+    import time
+    end = time.process_time() + seconds
+    while time.process_time() < end:
+        pass
+
+
+class TestBootProfiler(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def profiler(self, run_id):
+        return boot_profiler.BootProfiler(output_dir=self.tmpdir.name, run_id=run_id)
+
+    def test_stage_report_separates_cpu_from_subprocess_wait(self):
+        profiler = self.profiler("a")
+        with profiler.stage('work'):
+            busy(0.2)
+            runner.run(["sleep", "0.3"])
+            blob = bytearray(4 * 1024 * 1024)
+            del blob
+        report = profiler.reports[0]
+        self.assertGreaterEqual(report['cpu_seconds'], 0.15)
+        self.assertGreaterEqual(report['subprocess_seconds'], 0.25)
+        self.assertGreaterEqual(report['off_cpu_seconds'], 0.2)
+        self.assertIn("sleep", report['subprocess_by_command'])
+        self.assertGreaterEqual(report['peak_memory_bytes'], 4 * 1024 * 1024)
+        self.assertTrue(any("busy" in row['function'] for row in report['top_functions']))
+        self.assertTrue(os.path.exists(os.path.join(profiler.run_dir, "01-work.json")))
+        self.assertTrue(os.path.exists(os.path.join(profiler.run_dir, "01-work.prof")))
+
+    def test_budget_runs_stages_under_profiler(self):
+        profiler = self.profiler("a")
+        budget = boot_budget.BootBudget(profiler=profiler)
+        budget.run_stage('network', busy, 0.01)
+        budget.run_stage('video', busy, 0.01)
+        self.assertEqual([r['stage'] for r in profiler.reports], ['network', 'video'])
+
+    def test_record_startup(self):
+        profiler = self.profiler("a")
+        profiler.record_startup()
+        self.assertGreater(profiler.reports[0]['cpu_seconds'], 0)
+
+    def test_diff_two_runs(self):
+        fast, slow = self.profiler("fast"), self.profiler("slow")
+        with fast.stage('scan'):
+            busy(0.01)
+        with slow.stage('scan'):
+            busy(0.2)
+        with slow.stage('video'):
+            pass
+        lines = boot_profiler.diff_runs(fast.run_dir, slow.run_dir)
+        self.assertTrue(lines[0].startswith("scan: wall +"))
+        self.assertTrue(any("busy" in line for line in lines[1:]))
+        self.assertIn("video: only in B", lines)
+
+    def test_cli_show_and_diff(self):
+        run = self.profiler("a")
+        with run.stage('scan'):
+            pass
+        with patch('sys.stdout', new_callable=io.StringIO) as out:
+            self.assertEqual(boot_profiler.main(["show", run.run_dir]), 0)
+            self.assertEqual(boot_profiler.main(["diff", run.run_dir, run.run_dir]), 0)
+        self.assertIn("scan: wall", out.getvalue())
+        self.assertIn("scan: wall +0.000s", out.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+import unittest
+import os
+import sys
+import json
+import time
+import tempfile
+import subprocess
+
+import cv2
+import numpy
+
+import camera_probe
+
+
+def write_video(path, frame_value=None, frames=5):
+    # A small MJPG file; random frames by default, or frames filled with frame_value
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), 10, (64, 48))
+    rng = numpy.random.default_rng(0)
+    for _ in range(frames):
+        if frame_value is None:
+            frame = rng.integers(0, 255, (48, 64, 3), dtype=numpy.uint8)
+        else:
+            frame = numpy.full((48, 64, 3), frame_value, dtype=numpy.uint8)
+        writer.write(frame)
+    writer.release()
+    return path
+
+
+class SlowOpener:
+    """Opens file sources like cv2.VideoCapture, but stalls on the ones listed."""
+
+    def __init__(self, delays):
+        self.delays = delays
+        self.opened = []
+
+    def __call__(self, source, backend):
+        self.opened.append(source)
+        time.sleep(self.delays.get(source, 0))
+        return cv2.VideoCapture(source, backend)
+
+
+class TestCameraProbe(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.good = write_video(os.path.join(self.tmpdir.name, "good.avi"))
+        self.other = write_video(os.path.join(self.tmpdir.name, "other.avi"))
+        self.black = write_video(os.path.join(self.tmpdir.name, "black.avi"), frame_value=0)
+        self.missing = os.path.join(self.tmpdir.name, "missing.avi")
+        self.choice = os.path.join(self.tmpdir.name, "camera.json")
+        self.backends = [cv2.CAP_ANY]
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_first_source_with_a_valid_frame_wins(self):
+        found = camera_probe.probe_cameras([self.missing, self.black, self.good], self.backends, timeout=5)
+        self.assertIsNotNone(found)
+        cap, source, backend = found
+        self.assertEqual(source, self.good)
+        self.assertTrue(cap.isOpened())
+        cap.release()
+
+    def test_slow_source_does_not_block_a_fast_one(self):
+        opener = SlowOpener({self.other: 2})
+        started = time.perf_counter()
+        cap, source, _ = camera_probe.probe_cameras([self.other, self.good], self.backends, timeout=5, opener=opener)
+        self.assertEqual(source, self.good)
+        self.assertLess(time.perf_counter() - started, 1.5)
+        cap.release()
+
+    def test_gives_up_at_time_limit(self):
+        opener = SlowOpener({self.good: 2})
+        started = time.perf_counter()
+        self.assertIsNone(camera_probe.probe_cameras([self.good], self.backends, timeout=0.3, opener=opener))
+        self.assertLess(time.perf_counter() - started, 1.5)
+
+    def test_stalled_opener_does_not_keep_the_process_alive(self):
+        # A failed scan ends in sys.exit() (see verify_face); a camera stuck in open must not block that
+        project_dir = os.path.dirname(os.path.abspath(__file__))
+        script = ("import sys, time, camera_probe\n"
+                  "def stall(source, backend): time.sleep(30)\n"
+                  "found = camera_probe.probe_cameras([0], [0], timeout=0.3, opener=stall)\n"
+                  "sys.exit(1 if found is None else 0)\n")
+        started = time.perf_counter()
+        result = subprocess.run([sys.executable, "-c", script], cwd=project_dir, timeout=30)
+        self.assertEqual(result.returncode, 1)
+        self.assertLess(time.perf_counter() - started, 10)
+
+    def test_no_usable_source_returns_early(self):
+        started = time.perf_counter()
+        self.assertIsNone(camera_probe.probe_cameras([self.missing, self.black], self.backends, timeout=5))
+        self.assertLess(time.perf_counter() - started, 4)
+
+    def test_open_camera_remembers_and_reuses_choice(self):
+        with self.assertLogs(level='INFO'):
+            cap = camera_probe.open_camera(self.choice, sources=[self.missing, self.good], backends=self.backends, timeout=5)
+        cap.release()
+        with open(self.choice) as f:
+            self.assertEqual(json.load(f)["source"], self.good)
+
+        opener = SlowOpener({})
+        cap = camera_probe.open_camera(self.choice, sources=[self.missing, self.other], backends=self.backends, opener=opener)
+        self.assertEqual(opener.opened, [self.good]) # Opened directly, no probing
+        cap.release()
+
+    def test_stale_choice_triggers_a_new_probe(self):
+        camera_probe.save_choice(self.missing, cv2.CAP_ANY, self.choice)
+        with self.assertLogs(level='WARNING'):
+            cap = camera_probe.open_camera(self.choice, sources=[self.other], backends=self.backends, timeout=5)
+        cap.release()
+        self.assertEqual(camera_probe.load_choice(self.choice), (self.other, cv2.CAP_ANY))
+
+    def test_stalled_remembered_camera_is_time_limited(self):
+        camera_probe.save_choice(self.other, cv2.CAP_ANY, self.choice)
+        opener = SlowOpener({self.other: 3})
+        started = time.perf_counter()
+        with self.assertLogs(level='WARNING'):
+            cap = camera_probe.open_camera(self.choice, sources=[self.good], backends=self.backends, timeout=0.5, opener=opener)
+        self.assertLess(time.perf_counter() - started, 2.5)
+        self.assertTrue(cap.isOpened())
+        cap.release()
+        self.assertEqual(camera_probe.load_choice(self.choice), (self.good, cv2.CAP_ANY))
+
+    def test_valid_frame(self):
+        self.assertFalse(camera_probe.valid_frame(None))
+        self.assertFalse(camera_probe.valid_frame(numpy.zeros((4, 4, 3), dtype=numpy.uint8)))
+        self.assertTrue(camera_probe.valid_frame(numpy.ones((4, 4, 3), dtype=numpy.uint8)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+from unittest.mock import patch, MagicMock, ANY
+import os
+import sys
+import json
+import tempfile
+import subprocess
+
+import checkins
+
+
+class TestCheckins(unittest.TestCase):
+
+    @patch('runner.run')
+    def test_deliver_notification(self, mock_subprocess_run):
+        mock_subprocess_run.return_value = MagicMock(returncode=0)
+        self.assertTrue(checkins.deliver_notification("Notification Title", "Notification Message"))
+        expected_script = 'display notification "Notification Message" with title "Notification Title"'
+        mock_subprocess_run.assert_called_once_with(["osascript", "-e", expected_script], timeout=checkins.NOTIFICATION_TIMEOUT)
+
+    @patch('runner.run', side_effect=subprocess.TimeoutExpired("osascript", 10))
+    def test_deliver_notification_reports_failure(self, mock_subprocess_run):
+        self.assertFalse(checkins.deliver_notification("Title", "Message"))
+
+    @patch('checkins.get_outbox')
+    def test_send_notification_only_enqueues(self, mock_get_outbox):
+        checkins.send_notification("Notification Title", "Notification Message")
+        mock_get_outbox.return_value.enqueue.assert_called_once_with("Notification Title", "Notification Message")
+
+    @patch('os.path.exists', return_value=False)
+    @patch('checkins.send_notification')
+    def test_hourly_checkin_no_pause(self, mock_send_notification, mock_os_path_exists):
+        config = {"user_name": "TestUser", "hourly_checkin_message": "Hi {user_name}, check in!"}
+        checkins.hourly_checkin(config)
+        mock_os_path_exists.assert_called_once_with(checkins.PAUSE_FLAG)
+        mock_send_notification.assert_called_once_with("Jarvis", "Hi TestUser, check in!")
+
+    @patch('os.path.exists', return_value=True)
+    @patch('checkins.send_notification')
+    def test_hourly_checkin_with_pause(self, mock_send_notification, mock_os_path_exists):
+        config = {"user_name": "TestUser"}
+        checkins.hourly_checkin(config)
+        mock_os_path_exists.assert_called_once_with(checkins.PAUSE_FLAG)
+        mock_send_notification.assert_not_called()
+
+    @patch('schedule.every')
+    @patch('checkins.send_notification')
+    def test_start_hourly_checkins(self, mock_send_notification, mock_schedule_every):
+        config = {"user_name": "TestUser"}
+        checkins.start_hourly_checkins(config)
+        mock_send_notification.assert_called_once_with("Jarvis", "Notifications will appear here every hour.")
+        mock_schedule_every.return_value.hour.at.assert_called_once_with(":00")
+        mock_schedule_every.return_value.hour.at.return_value.do.assert_called_once_with(checkins.hourly_checkin, config=config)
+
+    def test_scheduler_process_never_imports_heavy_modules(self):
+        project_dir = os.path.dirname(os.path.abspath(__file__))
+        result = subprocess.run(
+            [sys.executable, "-c", "import sys, checkins; print(sorted(m for m in ('cv2', 'numpy', 'requests', 'main') if m in sys.modules))"],
+            capture_output=True, text=True, cwd=project_dir, check=True)
+        self.assertEqual(result.stdout.strip(), "[]")
+
+    def test_current_rss_bytes(self):
+        rss = checkins.current_rss_bytes()
+        self.assertIsNotNone(rss)
+        self.assertGreater(rss, 0)
+
+    @patch('runner.run', side_effect=FileNotFoundError("ps"))
+    def test_current_rss_bytes_unavailable(self, mock_subprocess_run):
+        self.assertIsNone(checkins.current_rss_bytes())
+
+    @patch('os.execve')
+    @patch('checkins.current_rss_bytes', return_value=200 * 1024 * 1024)
+    def test_hand_off_execs_scheduler_with_rss(self, mock_rss, mock_execve):
+        checkins.hand_off('config.json')
+        mock_execve.assert_called_once_with(
+            sys.executable, [sys.executable, os.path.abspath(checkins.__file__), "--config", os.path.abspath('config.json')], ANY)
+        env = mock_execve.call_args[0][2]
+        self.assertEqual(env[checkins.RSS_BEFORE_ENV], str(200 * 1024 * 1024))
+
+    @patch('checkins.run_scheduler_loop')
+    @patch('checkins.start_hourly_checkins')
+    @patch('checkins.current_rss_bytes', return_value=20 * 1024 * 1024)
+    def test_main_reports_rss_and_starts_checkins(self, mock_rss, mock_start, mock_loop):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            config_path = os.path.join(tmpdir, "config.json")
+            with open(config_path, 'w') as f:
+                json.dump({"user_name": "TestUser"}, f)
+            with patch.dict(os.environ, {checkins.RSS_BEFORE_ENV: str(200 * 1024 * 1024)}):
+                with self.assertLogs(level='INFO') as logs:
+                    checkins.main(["--config", config_path])
+                self.assertNotIn(checkins.RSS_BEFORE_ENV, os.environ)
+        self.assertIn("RSS before hand-off: 200.0 MB, after: 20.0 MB", "\n".join(logs.output))
+        mock_start.assert_called_once_with({"user_name": "TestUser"})
+        mock_loop.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import os
+import json
+import socket
+import tempfile
+import threading
+
+import main
+import daemon
+import jarvis_client
+
+
+class TestJarvisDaemon(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.config_path = os.path.join(self.tmpdir.name, "config.json")
+        with open(self.config_path, 'w') as f:
+            json.dump({"voice": "Alex"}, f)
+        self.socket_path = os.path.join(self.tmpdir.name, "d.sock")
+        self.daemon = daemon.JarvisDaemon(config_path=self.config_path, socket_path=self.socket_path)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    @patch('main.prepare_resources', return_value={"face_cascade": None, "cue_player": None})
+    def test_warm_only_reloads_changed_config(self, mock_prepare):
+        self.daemon.warm()
+        self.daemon.warm()
+        mock_prepare.assert_called_once()
+        self.assertEqual(self.daemon.config, {"voice": "Alex"})
+
+        with open(self.config_path, 'w') as f:
+            json.dump({"voice": "Daniel"}, f)
+        os.utime(self.config_path, (0, 0))
+        self.daemon.warm()
+        self.assertEqual(mock_prepare.call_count, 2)
+        self.assertEqual(self.daemon.config, {"voice": "Daniel"})
+
+    @patch('main.prepare_resources', return_value={})
+    def test_handle_activate_defers_boot_sequence(self, mock_prepare):
+        response, action = self.daemon.handle({"command": "activate"})
+        self.assertTrue(response["ok"])
+        self.assertIn("ready_seconds", response)
+        self.assertEqual(action, self.daemon.activate)
+
+    def test_handle_unknown_command(self):
+        response, action = self.daemon.handle({"command": "dance"})
+        self.assertFalse(response["ok"])
+        self.assertIsNone(action)
+
+    @patch('main.run_boot_sequence', side_effect=SystemExit)
+    def test_activate_survives_denied_verification(self, mock_boot):
+        self.daemon.activate()
+        mock_boot.assert_called_once()
+
+    @patch('schedule.run_pending')
+    @patch('main.run_boot_sequence')
+    @patch('main.prepare_resources', return_value={})
+    def test_socket_round_trip(self, mock_prepare, mock_boot, mock_run_pending):
+        self.daemon.start()
+        server = threading.Thread(target=self.daemon.serve_forever)
+        server.start()
+        try:
+            self.assertTrue(jarvis_client.send_command("ping", self.socket_path)["ok"])
+            self.assertEqual(jarvis_client.activate(self.socket_path), 0)
+        finally:
+            jarvis_client.send_command("shutdown", self.socket_path)
+            server.join(timeout=5)
+        mock_boot.assert_called_once_with(self.daemon.config, {})
+        mock_prepare.assert_called_once()
+        self.assertFalse(os.path.exists(self.socket_path))
+
+    @patch('main.launch')
+    @patch('main.run_dialog')
+    @patch('main.prepare_resources', return_value={})
+    def test_repeated_activations_keep_offering_arc(self, mock_prepare, mock_run_dialog, mock_launch):
+        with open(self.config_path, 'w') as f:
+            json.dump({"apps": ["Arc", "Spotify"]}, f)
+        mock_run_dialog.return_value = MagicMock(returncode=0, stdout="button returned:Continue")
+        self.daemon.warm()
+        with patch('main.run_boot_sequence', side_effect=lambda config, resources: main.open_apps_and_folders(config)), \
+             patch('time.sleep'), patch('main.speak'):
+            self.daemon.activate()
+            self.daemon.activate()
+
+        arc_prompts = [c for c in mock_run_dialog.call_args_list if 'Open Arc?' in c[0][0]]
+        self.assertEqual(len(arc_prompts), 2)
+        self.assertEqual(self.daemon.config["apps"], ["Arc", "Spotify"])
+
+    @patch('main.prepare_resources', return_value={})
+    def test_start_refuses_to_steal_live_socket(self, mock_prepare):
+        live = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        live.bind(self.socket_path)
+        live.listen(1)
+        try:
+            with self.assertRaises(RuntimeError):
+                self.daemon.start()
+            self.assertTrue(os.path.exists(self.socket_path))
+        finally:
+            live.close()
+
+    @patch('main.prepare_resources', return_value={})
+    def test_start_replaces_stale_socket(self, mock_prepare):
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(self.socket_path)
+        stale.close() # Bound but nobody listening: connect is refused
+        self.daemon.start()
+        self.daemon._server.close()
+
+    @patch('jarvis_client.send_command', side_effect=socket.timeout)
+    def test_client_reports_busy_daemon(self, mock_send):
+        with self.assertLogs(level='ERROR') as logs:
+            self.assertEqual(jarvis_client.activate(self.socket_path), 1)
+        self.assertIn("busy", logs.output[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,16 +1,18 @@
 import unittest
-from unittest.mock import patch, mock_open, MagicMock, call
+from unittest.mock import patch, mock_open, MagicMock, call, ANY
 import json
 import os
 import sys
 from datetime import datetime
 import socket # For mocking network check
-import subprocess # For mocking subprocess.run specifically for network scan
+import numpy # Real frames for cv2.cvtColor in the facial scan tests
+import subprocess # For subprocess.TimeoutExpired in the network scan tests
 
 # Assuming test_main.py is in the same directory as main.py
 # If main.py is in a different location relative to this test file,
 # sys.path might need adjustment.
 import main as jarvis_main
+import speech
 
 class TestJarvisAssistant(unittest.TestCase):
 
@@ -29,94 +31,100 @@ class TestJarvisAssistant(unittest.TestCase):
         self.assertEqual(config, expected_config)
         jarvis_main.CONFIG_FILE = original_config_file # Restore
 
-    @patch('subprocess.run')
-    def test_speak(self, mock_subprocess_run):
+    @patch('runner.spawn')
+    def test_speak(self, mock_spawn):
+        mock_spawn.return_value.result.return_value = MagicMock(returncode=0)
         message = "Hello Jarvis"
         jarvis_main.speak(message)
-        mock_subprocess_run.assert_called_once_with(["say", message])
+        mock_spawn.assert_called_once_with(["say", message], timeout=speech.SPEAK_TIMEOUT)
 
-    @patch('subprocess.run')
-    def test_send_notification(self, mock_subprocess_run):
-        title = "Notification Title"
-        message = "Notification Message"
-        jarvis_main.send_notification(title, message)
-        expected_script = f'display notification "{message}" with title "{title}"'
-        mock_subprocess_run.assert_called_once_with(["osascript", "-e", expected_script])
+    @patch('runner.spawn', side_effect=FileNotFoundError("say"))
+    def test_speak_missing_say_is_logged_not_raised(self, mock_spawn):
+        with self.assertLogs(level='ERROR'):
+            jarvis_main.speak("Hello Jarvis")
 
-    @patch('subprocess.run')
+    @patch('runner.run')
     def test_show_initial_prompt(self, mock_subprocess_run):
         jarvis_main.show_initial_prompt()
         expected_script = 'display dialog "Ready to proceed?" buttons {"Continue"} default button 1 with title "Jarvis"'
-        mock_subprocess_run.assert_called_once_with(["osascript", "-e", expected_script])
+        mock_subprocess_run.assert_called_once_with(["osascript", "-e", expected_script], timeout=jarvis_main.DIALOG_TIMEOUT)
 
-    @patch('subprocess.run')
+    @patch('runner.run')
     def test_ask_for_password_correct(self, mock_subprocess_run):
-        mock_result = MagicMock()
+        mock_result = MagicMock(returncode=0)
         mock_result.stdout = "button returned:Continue\ntext returned:iron man"
         mock_subprocess_run.return_value = mock_result
         self.assertTrue(jarvis_main.ask_for_password())
         expected_script = 'display dialog "Please enter the passphrase to continue:" default answer "" with hidden answer buttons {"Continue"} default button 1 with title "Jarvis"'
-        mock_subprocess_run.assert_called_once_with(["osascript", "-e", expected_script], capture_output=True, text=True)
+        mock_subprocess_run.assert_called_once_with(["osascript", "-e", expected_script], timeout=jarvis_main.DIALOG_TIMEOUT)
 
-    @patch('subprocess.run')
+    @patch('runner.run')
     def test_ask_for_password_incorrect(self, mock_subprocess_run):
-        mock_result = MagicMock()
+        mock_result = MagicMock(returncode=0)
         mock_result.stdout = "button returned:Continue\ntext returned:wrong"
         mock_subprocess_run.return_value = mock_result
         self.assertFalse(jarvis_main.ask_for_password())
 
-    @patch('subprocess.run')
+    @patch('runner.run')
     def test_ask_for_password_cancel(self, mock_subprocess_run):
-        mock_result = MagicMock()
+        mock_result = MagicMock(returncode=0)
         mock_result.stdout = "button returned:Cancel"
         mock_subprocess_run.return_value = mock_result
         self.assertFalse(jarvis_main.ask_for_password())
 
-    @patch('subprocess.run')
+    @patch('runner.run')
     def test_ask_for_name_correct(self, mock_subprocess_run):
-        mock_result = MagicMock()
+        mock_result = MagicMock(returncode=0)
         mock_result.stdout = "button returned:Confirm\ntext returned:Diego"
         mock_subprocess_run.return_value = mock_result
         self.assertTrue(jarvis_main.ask_for_name("Diego"))
         expected_script = 'display dialog "Please state your name to confirm identity:" default answer "" buttons {"Confirm"} default button 1 with title "Jarvis Identity Check"'
-        mock_subprocess_run.assert_called_once_with(["osascript", "-e", expected_script], capture_output=True, text=True)
+        mock_subprocess_run.assert_called_once_with(["osascript", "-e", expected_script], timeout=jarvis_main.DIALOG_TIMEOUT)
 
-    @patch('subprocess.run')
+    @patch('runner.run')
     def test_ask_for_name_incorrect(self, mock_subprocess_run):
-        mock_result = MagicMock()
+        mock_result = MagicMock(returncode=0)
         mock_result.stdout = "button returned:Confirm\ntext returned:NotDiego"
         mock_subprocess_run.return_value = mock_result
         self.assertFalse(jarvis_main.ask_for_name("Diego"))
 
-    @patch('subprocess.run')
+    @patch('runner.run')
     def test_ask_for_name_cancel(self, mock_subprocess_run):
-        mock_result = MagicMock()
+        mock_result = MagicMock(returncode=0)
         mock_result.stdout = "button returned:Cancel"
         mock_result.returncode = 1
         mock_subprocess_run.return_value = mock_result
         self.assertFalse(jarvis_main.ask_for_name("Diego"))
 
-    @patch('os.path.exists', return_value=True)
-    @patch('subprocess.run')
-    def test_play_bootup_sound_exists(self, mock_subprocess_run, mock_os_path_exists):
-        sound_path = "/path/to/sound.wav"
-        jarvis_main.play_bootup_sound(sound_path)
-        mock_os_path_exists.assert_called_once_with(sound_path)
-        mock_subprocess_run.assert_called_once_with(["afplay", sound_path])
+    @patch('runner.run')
+    def test_ask_for_password_uses_expected_passphrase(self, mock_subprocess_run):
+        mock_subprocess_run.return_value = MagicMock(returncode=0, stdout="button returned:Continue\ntext returned:mark 42")
+        self.assertTrue(jarvis_main.ask_for_password("mark 42"))
+        self.assertFalse(jarvis_main.ask_for_password())
 
-    @patch('os.path.exists', return_value=False)
-    @patch('subprocess.run')
-    def test_play_bootup_sound_not_exists(self, mock_subprocess_run, mock_os_path_exists):
-        sound_path = "/path/to/nonexistent.wav"
-        jarvis_main.play_bootup_sound(sound_path)
-        mock_os_path_exists.assert_called_once_with(sound_path)
-        mock_subprocess_run.assert_not_called()
-
-    @patch('subprocess.Popen')
-    @patch('subprocess.run')
+    @patch('runner.run')
+    def test_ask_for_identity_single_round_trip(self, mock_subprocess_run):
+        mock_subprocess_run.return_value = MagicMock(returncode=0, stdout="Diego\niron man\n")
+        self.assertEqual(jarvis_main.ask_for_identity(), ("Diego", "iron man"))
+        mock_subprocess_run.assert_called_once_with(["osascript", "-e", jarvis_main.IDENTITY_DIALOG_SCRIPT], timeout=jarvis_main.DIALOG_TIMEOUT)
+
+    @patch('runner.run')
+    def test_padded_passphrase_is_treated_alike_by_both_flows(self, mock_subprocess_run):
+        passphrase = "  iron man "
+        mock_subprocess_run.return_value = MagicMock(returncode=0, stdout=f"button returned:Continue\ntext returned:{passphrase}")
+        self.assertTrue(jarvis_main.ask_for_password("iron man"))
+        mock_subprocess_run.return_value = MagicMock(returncode=0, stdout=f"Diego\n{passphrase}\n")
+        self.assertEqual(jarvis_main.ask_for_identity(), ("Diego", "iron man"))
+
+    @patch('runner.run')
+    def test_ask_for_identity_cancel(self, mock_subprocess_run):
+        mock_subprocess_run.return_value = MagicMock(returncode=1, stdout="", stderr="User canceled. (-128)")
+        self.assertIsNone(jarvis_main.ask_for_identity())
+
+    @patch('runner.spawn')
+    @patch('runner.run')
     @patch('main.speak')
-    @patch('threading.Thread')
-    def test_open_apps_and_folders_with_arc_confirm(self, mock_thread_class, mock_speak, mock_subprocess_run_dialog, mock_subprocess_popen):
+    def test_open_apps_and_folders_with_arc_confirm(self, mock_speak, mock_subprocess_run_dialog, mock_subprocess_popen):
         config = {
             "apps": ["Arc", "Spotify", "Notion"],
             "folders": ["/Users/test/Desktop"],
@@ -126,38 +134,33 @@ class TestJarvisAssistant(unittest.TestCase):
         mock_arc_dialog_result = MagicMock(stdout="button returned:Continue", returncode=0)
         mock_subprocess_run_dialog.side_effect = [mock_general_dialog_result, mock_arc_dialog_result]
 
-        mock_sound_thread = MagicMock()
-        mock_thread_class.return_value = mock_sound_thread
-
-        jarvis_main.open_apps_and_folders(config, sound_thread_to_start=mock_sound_thread)
+        jarvis_main.open_apps_and_folders(config)
 
         expected_arc_dialog_script = 'display dialog "Open Arc?" buttons {"Continue", "Cancel"} default button "Continue" with title "Jarvis"'
         expected_general_dialog_script = 'display dialog "Open configured applications and folders (excluding Arc)?" buttons {"Open Apps", "Continue"} default button "Open Apps" with title "Jarvis"'
 
         self.assertEqual(mock_subprocess_run_dialog.call_count, 2)
         mock_subprocess_run_dialog.assert_any_call(
-            ["osascript", "-e", expected_general_dialog_script], capture_output=True, text=True
+            ["osascript", "-e", expected_general_dialog_script], timeout=jarvis_main.DIALOG_TIMEOUT
         )
         mock_subprocess_run_dialog.assert_any_call(
-            ["osascript", "-e", expected_arc_dialog_script], capture_output=True, text=True
+            ["osascript", "-e", expected_arc_dialog_script], timeout=jarvis_main.DIALOG_TIMEOUT
         )
 
         expected_popen_calls = [
-            call(["open", "-a", "Spotify"]),
-            call(["open", "-a", "Notion"]),
-            call(["open", "/Users/test/Desktop"]),
-            call(["open", "-a", "Arc"])
+            call(["open", "-a", "Spotify"], timeout=jarvis_main.LAUNCH_TIMEOUT),
+            call(["open", "-a", "Notion"], timeout=jarvis_main.LAUNCH_TIMEOUT),
+            call(["open", "/Users/test/Desktop"], timeout=jarvis_main.LAUNCH_TIMEOUT),
+            call(["open", "-a", "Arc"], timeout=jarvis_main.LAUNCH_TIMEOUT)
         ]
         mock_subprocess_popen.assert_has_calls(expected_popen_calls, any_order=False)
         self.assertEqual(mock_subprocess_popen.call_count, 4)
         mock_speak.assert_not_called()
-        mock_sound_thread.start.assert_called_once()
 
-    @patch('subprocess.Popen')
-    @patch('subprocess.run')
+    @patch('runner.spawn')
+    @patch('runner.run')
     @patch('main.speak')
-    @patch('threading.Thread')
-    def test_open_apps_and_folders_with_arc_cancel(self, mock_thread_class, mock_speak, mock_subprocess_run_dialog, mock_subprocess_popen):
+    def test_open_apps_and_folders_with_arc_cancel(self, mock_speak, mock_subprocess_run_dialog, mock_subprocess_popen):
         config = {
             "apps": ["Arc", "Spotify"],
             "folders": [],
@@ -167,23 +170,18 @@ class TestJarvisAssistant(unittest.TestCase):
         mock_arc_dialog_result = MagicMock(stdout="button returned:Cancel", returncode=0)
         mock_subprocess_run_dialog.side_effect = [mock_general_dialog_result, mock_arc_dialog_result]
 
-        mock_sound_thread = MagicMock()
-        mock_thread_class.return_value = mock_sound_thread
-
-        jarvis_main.open_apps_and_folders(config, sound_thread_to_start=mock_sound_thread)
+        jarvis_main.open_apps_and_folders(config)
 
         expected_arc_dialog_script = 'display dialog "Open Arc?" buttons {"Continue", "Cancel"} default button "Continue" with title "Jarvis"'
         mock_subprocess_run_dialog.assert_any_call(
-            ["osascript", "-e", expected_arc_dialog_script], capture_output=True, text=True
+            ["osascript", "-e", expected_arc_dialog_script], timeout=jarvis_main.DIALOG_TIMEOUT
         )
-        mock_subprocess_popen.assert_called_once_with(["open", "-a", "Spotify"])
+        mock_subprocess_popen.assert_called_once_with(["open", "-a", "Spotify"], timeout=jarvis_main.LAUNCH_TIMEOUT)
         mock_speak.assert_called_once_with("Okay, I will not open Arc.", voice="Alex")
-        mock_sound_thread.start.assert_called_once()
 
-    @patch('subprocess.Popen')
-    @patch('subprocess.run')
-    @patch('threading.Thread')
-    def test_open_apps_and_folders_no_arc(self, mock_thread_class, mock_subprocess_run_dialog, mock_subprocess_popen):
+    @patch('runner.spawn')
+    @patch('runner.run')
+    def test_open_apps_and_folders_no_arc(self, mock_subprocess_run_dialog, mock_subprocess_popen):
         config = {
             "apps": ["Spotify", "Notion"],
             "folders": ["/Users/test/Documents"],
@@ -192,55 +190,35 @@ class TestJarvisAssistant(unittest.TestCase):
         mock_general_dialog_result = MagicMock(stdout="button returned:Open Apps", returncode=0)
         mock_subprocess_run_dialog.return_value = mock_general_dialog_result
 
-        mock_sound_thread = MagicMock()
-        mock_thread_class.return_value = mock_sound_thread
-
-        jarvis_main.open_apps_and_folders(config, sound_thread_to_start=mock_sound_thread)
+        jarvis_main.open_apps_and_folders(config)
 
         expected_popen_calls = [
-            call(["open", "-a", "Spotify"]),
-            call(["open", "-a", "Notion"]),
-            call(["open", "/Users/test/Documents"]),
+            call(["open", "-a", "Spotify"], timeout=jarvis_main.LAUNCH_TIMEOUT),
+            call(["open", "-a", "Notion"], timeout=jarvis_main.LAUNCH_TIMEOUT),
+            call(["open", "/Users/test/Documents"], timeout=jarvis_main.LAUNCH_TIMEOUT),
         ]
         mock_subprocess_popen.assert_has_calls(expected_popen_calls, any_order=True)
         self.assertEqual(mock_subprocess_popen.call_count, 3)
         expected_general_dialog_script = 'display dialog "Open configured applications and folders (excluding Arc)?" buttons {"Open Apps", "Continue"} default button "Open Apps" with title "Jarvis"'
         mock_subprocess_run_dialog.assert_called_once_with(
-            ["osascript", "-e", expected_general_dialog_script], capture_output=True, text=True
+            ["osascript", "-e", expected_general_dialog_script], timeout=jarvis_main.DIALOG_TIMEOUT
         )
-        mock_sound_thread.start.assert_called_once()
-
-    @patch('os.path.exists', return_value=False)
-    @patch('main.send_notification')
-    def test_hourly_checkin_no_pause(self, mock_send_notification, mock_os_path_exists):
-        config = {"user_name": "TestUser", "hourly_checkin_message": "Hi {user_name}, check in!"}
-        jarvis_main.hourly_checkin(config)
-        mock_os_path_exists.assert_called_once_with(jarvis_main.PAUSE_FLAG)
-        mock_send_notification.assert_called_once_with("Jarvis", "Hi TestUser, check in!")
 
-    @patch('os.path.exists', return_value=True)
-    @patch('main.send_notification')
-    def test_hourly_checkin_with_pause(self, mock_send_notification, mock_os_path_exists):
-        config = {"user_name": "TestUser"}
-        jarvis_main.hourly_checkin(config)
-        mock_os_path_exists.assert_called_once_with(jarvis_main.PAUSE_FLAG)
-        mock_send_notification.assert_not_called()
-
-    @patch('subprocess.run')
+    @patch('runner.run')
     def test_get_network_device_info_success(self, mock_subprocess_run):
         mock_result = MagicMock()
         mock_result.returncode = 0
         mock_result.stdout = (
-            "? (192.168.1.1) at 00:1a:11:xx:xx:xx on en0 ifscope [ethernet]\n"
-            "? (192.168.1.100) at 70:3a:0e:yy:yy:yy on en0 ifscope [ethernet]\n"
-            "? (192.168.1.101) at aa:bb:cc:zz:zz:zz on en0 ifscope [ethernet]\n" # Unknown OUI
+            "? (192.168.1.1) at 00:1a:11:0a:0b:0c on en0 ifscope [ethernet]\n"
+            "? (192.168.1.100) at 70:3a:0e:1a:1b:1c on en0 ifscope [ethernet]\n"
+            "? (192.168.1.101) at aa:bb:cc:2a:2b:2c on en0 ifscope [ethernet]\n" # Unknown OUI
             "? (192.168.1.255) at (incomplete) on en0 ifscope [ethernet]\n"
         )
         mock_subprocess_run.return_value = mock_result
 
         count, manufacturers = jarvis_main.get_network_device_info()
 
-        mock_subprocess_run.assert_called_once_with(["arp", "-a"], capture_output=True, text=True, check=False, timeout=10)
+        mock_subprocess_run.assert_called_once_with(["arp", "-a"], timeout=jarvis_main.ARP_TIMEOUT)
         self.assertEqual(count, 3)
         self.assertEqual(manufacturers, {
             "Apple": 1,
@@ -248,7 +226,7 @@ class TestJarvisAssistant(unittest.TestCase):
             "Unknown Manufacturer": 1
         })
 
-    @patch('subprocess.run')
+    @patch('runner.run')
     def test_get_network_device_info_arp_command_fail(self, mock_subprocess_run):
         mock_result = MagicMock()
         mock_result.returncode = 1
@@ -259,19 +237,19 @@ class TestJarvisAssistant(unittest.TestCase):
         self.assertEqual(count, 0)
         self.assertEqual(manufacturers, {})
 
-    @patch('subprocess.run', side_effect=FileNotFoundError("arp not found"))
+    @patch('runner.run', side_effect=FileNotFoundError("arp not found"))
     def test_get_network_device_info_arp_not_found(self, mock_subprocess_run):
         count, manufacturers = jarvis_main.get_network_device_info()
         self.assertEqual(count, 0)
         self.assertEqual(manufacturers, {})
 
-    @patch('subprocess.run', side_effect=subprocess.TimeoutExpired(cmd="arp -a", timeout=5))
+    @patch('runner.run', side_effect=subprocess.TimeoutExpired(cmd="arp -a", timeout=5))
     def test_get_network_device_info_timeout(self, mock_subprocess_run):
         count, manufacturers = jarvis_main.get_network_device_info()
         self.assertEqual(count, 0)
         self.assertEqual(manufacturers, {})
 
-    @patch('subprocess.run')
+    @patch('runner.run')
     def test_get_network_device_info_empty_output(self, mock_subprocess_run):
         mock_result = MagicMock(returncode=0, stdout="")
         mock_subprocess_run.return_value = mock_result
@@ -279,7 +257,7 @@ class TestJarvisAssistant(unittest.TestCase):
         self.assertEqual(count, 0)
         self.assertEqual(manufacturers, {})
 
-    @patch('subprocess.run')
+    @patch('runner.run')
     def test_get_network_device_info_incomplete_only(self, mock_subprocess_run):
         mock_result = MagicMock(returncode=0, stdout="? (192.168.1.255) at (incomplete) on en0 ifscope [ethernet]\n")
         mock_subprocess_run.return_value = mock_result
@@ -305,15 +283,14 @@ class TestJarvisAssistant(unittest.TestCase):
         self.assertFalse(jarvis_main.check_internet_connection())
         mock_socket_instance.connect.assert_called_once_with(("8.8.8.8", 53))
 
-    @patch('cv2.VideoCapture')
+    @patch('camera_probe.open_camera')
     @patch('cv2.CascadeClassifier')
     @patch('os.path.exists', return_value=True)
     @patch('main.speak')
-    def test_perform_facial_scan_face_detected(self, mock_speak, mock_os_path_exists, mock_cascade_classifier, mock_video_capture):
+    def test_perform_facial_scan_face_detected(self, mock_speak, mock_os_path_exists, mock_cascade_classifier, mock_open_camera):
         mock_cap_instance = MagicMock()
-        mock_cap_instance.isOpened.return_value = True
-        mock_cap_instance.read.return_value = (True, MagicMock())
-        mock_video_capture.return_value = mock_cap_instance
+        mock_cap_instance.read.return_value = (True, numpy.zeros((48, 64, 3), dtype=numpy.uint8))
+        mock_open_camera.return_value = mock_cap_instance
 
         mock_cascade_instance = MagicMock()
         mock_cascade_instance.detectMultiScale.return_value = [(10, 20, 30, 40)]
@@ -323,15 +300,14 @@ class TestJarvisAssistant(unittest.TestCase):
         mock_cap_instance.release.assert_called_once()
         mock_speak.assert_not_called()
 
-    @patch('cv2.VideoCapture')
+    @patch('camera_probe.open_camera')
     @patch('cv2.CascadeClassifier')
     @patch('os.path.exists', return_value=True)
     @patch('main.speak')
-    def test_perform_facial_scan_no_face_detected(self, mock_speak, mock_os_path_exists, mock_cascade_classifier, mock_video_capture):
+    def test_perform_facial_scan_no_face_detected(self, mock_speak, mock_os_path_exists, mock_cascade_classifier, mock_open_camera):
         mock_cap_instance = MagicMock()
-        mock_cap_instance.isOpened.return_value = True
-        mock_cap_instance.read.return_value = (True, MagicMock())
-        mock_video_capture.return_value = mock_cap_instance
+        mock_cap_instance.read.return_value = (True, numpy.zeros((48, 64, 3), dtype=numpy.uint8))
+        mock_open_camera.return_value = mock_cap_instance
 
         mock_cascade_instance = MagicMock()
         mock_cascade_instance.detectMultiScale.return_value = []
@@ -341,13 +317,10 @@ class TestJarvisAssistant(unittest.TestCase):
         mock_cap_instance.release.assert_called_once()
         mock_speak.assert_not_called()
 
-    @patch('cv2.VideoCapture')
+    @patch('camera_probe.open_camera', return_value=None)
     @patch('os.path.exists', return_value=True)
     @patch('main.speak')
-    def test_perform_facial_scan_webcam_error(self, mock_speak, mock_os_path_exists, mock_video_capture):
-        mock_cap_instance = MagicMock()
-        mock_cap_instance.isOpened.return_value = False
-        mock_video_capture.return_value = mock_cap_instance
+    def test_perform_facial_scan_webcam_error(self, mock_speak, mock_os_path_exists, mock_open_camera):
 
         self.assertFalse(jarvis_main.perform_facial_scan(voice_for_errors="Alex"))
         mock_speak.assert_called_once_with("Unable to access webcam for facial scan.", voice="Alex")
@@ -359,6 +332,7 @@ class TestJarvisAssistant(unittest.TestCase):
         mock_os_path_exists.assert_called_once()
         mock_speak.assert_called_once_with("Facial recognition module error. Cascade file missing.", voice="Alex")
 
+    @patch('os.path.exists', return_value=True) # Startup video is configured and present
     @patch('main.load_config')
     @patch('main.perform_facial_scan')
     @patch('main.ask_for_name')
@@ -367,20 +341,20 @@ class TestJarvisAssistant(unittest.TestCase):
     @patch('main.check_internet_connection')
     @patch('main.play_video_fullscreen')
     @patch('main.get_network_device_info') # New patch
-    @patch('threading.Thread')
+    @patch('audio_cues.load_cues_from_config')
     @patch('main.open_apps_and_folders')
     @patch('main.speak')
     @patch('main.send_notification')
     @patch('requests.get')
-    @patch('schedule.every')
+    @patch('main.start_hourly_checkins')
     @patch('time.time', side_effect=[0, 0.1, 0.2, 0.3, 10]) # For facial scan loop
     @patch('time.sleep')
     @patch('sys.exit')
-    @patch('subprocess.run')
-    def test_main_flow_access_granted(self, mock_subprocess_run_ip_dialog, mock_sys_exit, mock_time_sleep, mock_time_time, mock_schedule_every,
+    @patch('runner.run')
+    def test_main_flow_access_granted(self, mock_subprocess_run_ip_dialog, mock_sys_exit, mock_time_sleep, mock_time_time, mock_start_checkins,
                                       mock_requests_get, mock_send_notification_main, mock_speak_main, mock_open_apps,
-                                      mock_thread_class, mock_get_network_device_info, mock_play_video, mock_check_internet,
-                                      mock_ask_password, mock_show_initial_prompt, mock_ask_for_name, mock_perform_facial_scan, mock_load_config):
+                                      mock_load_cues, mock_get_network_device_info, mock_play_video, mock_check_internet,
+                                      mock_ask_password, mock_show_initial_prompt, mock_ask_for_name, mock_perform_facial_scan, mock_load_config, mock_os_path_exists):
         # Note: mock_time_time is for perform_facial_scan, mock_time_sleep is for main loop
         mock_config_data = {
             "sound": "boot.wav", "apps": ["TestApp"], "folders": ["/test/folder"],
@@ -397,12 +371,8 @@ class TestJarvisAssistant(unittest.TestCase):
         mock_check_internet.return_value = True
         mock_get_network_device_info.return_value = (2, {"Apple": 1, "Google": 1}) # Mock network scan result
 
-        mock_thread_instance = MagicMock()
-        mock_thread_instance.is_alive.return_value = False
-        mock_thread_class.return_value = mock_thread_instance
-
-        mock_job = MagicMock()
-        mock_schedule_every.return_value.hour.return_value.at.return_value.do.return_value = mock_job
+        mock_cue_player = MagicMock()
+        mock_load_cues.return_value = mock_cue_player
 
         sleep_call_count = 0
         def time_sleep_side_effect(duration):
@@ -422,16 +392,17 @@ class TestJarvisAssistant(unittest.TestCase):
             jarvis_main.main()
 
         mock_load_config.assert_called_once()
-        mock_perform_facial_scan.assert_called_once_with(voice_for_errors=mock_config_data['voice'], duration_seconds=mock_config_data['facial_scan_duration_seconds'])
+        mock_perform_facial_scan.assert_called_once_with(voice_for_errors=mock_config_data['voice'], duration_seconds=mock_config_data['facial_scan_duration_seconds'], face_cascade=ANY)
         mock_ask_for_name.assert_called_once_with("Diego")
         mock_show_initial_prompt.assert_called_once()
         mock_ask_password.assert_called_once()
         mock_check_internet.assert_called_once()
         mock_get_network_device_info.assert_called_once() # Verify network scan is called
         mock_play_video.assert_called_once_with(mock_config_data['startup_video_path'], mock_config_data['voice'])
-        mock_thread_class.assert_called_once_with(target=jarvis_main.play_bootup_sound, args=(mock_config_data.get('sound'),))
-        mock_open_apps.assert_called_once_with(mock_config_data, sound_thread_to_start=mock_thread_instance)
-        mock_thread_instance.join.assert_called_once()
+        mock_load_cues.assert_called_once_with(mock_config_data)
+        mock_cue_player.play.assert_called_once_with("bootup")
+        mock_open_apps.assert_called_once_with(mock_config_data, skip_running=False)
+        mock_cue_player.wait_all.assert_called_once()
 
         speak_calls = mock_speak_main.call_args_list
         self.assertIn(call("Initiating identity verification sequence.", voice="Daniel"), speak_calls)
@@ -451,8 +422,7 @@ class TestJarvisAssistant(unittest.TestCase):
 
         notification_calls = mock_send_notification_main.call_args_list
         self.assertIn(call("Your IP Address", "123.123.123.123"), notification_calls)
-        self.assertIn(call("Jarvis", "Notifications will appear here every hour."), notification_calls)
-        mock_schedule_every.return_value.hour.return_value.at.return_value.do.assert_called_once_with(jarvis_main.hourly_checkin, config=mock_config_data)
+        mock_start_checkins.assert_called_once_with(mock_config_data)
         mock_sys_exit.assert_not_called()
 
     @patch('main.load_config')
@@ -461,11 +431,11 @@ class TestJarvisAssistant(unittest.TestCase):
     @patch('main.show_initial_prompt')
     @patch('main.ask_for_password')
     @patch('main.speak')
-    @patch('sys.exit')
+    @patch('sys.exit', side_effect=SystemExit)
     @patch('time.sleep')
-    @patch('threading.Thread')
+    @patch('audio_cues.load_cues_from_config')
     @patch('main.open_apps_and_folders')
-    def test_main_flow_password_denied(self, mock_open_apps, mock_thread_class, mock_time_sleep, mock_sys_exit,
+    def test_main_flow_password_denied(self, mock_open_apps, mock_load_cues, mock_time_sleep, mock_sys_exit,
                                      mock_speak_main, mock_ask_password, mock_show_initial_prompt, mock_ask_name,
                                      mock_perform_facial_scan, mock_load_config):
         mock_load_config.return_value = {"voice": "Ava", "facial_scan_duration_seconds": 5}
@@ -473,11 +443,12 @@ class TestJarvisAssistant(unittest.TestCase):
         mock_ask_name.return_value = True
         mock_ask_password.return_value = False
 
-        jarvis_main.main()
+        with self.assertRaises(SystemExit):
+            jarvis_main.main()
 
         mock_load_config.assert_called_once()
         mock_speak_main.assert_any_call("Initiating identity verification sequence.", voice="Ava")
-        mock_perform_facial_scan.assert_called_once_with(voice_for_errors="Ava", duration_seconds=5)
+        mock_perform_facial_scan.assert_called_once_with(voice_for_errors="Ava", duration_seconds=5, face_cascade=ANY)
         mock_speak_main.assert_any_call("Facial scan successful. Primary user profile detected.", voice="Ava")
         mock_ask_name.assert_called_once_with("Diego")
         mock_show_initial_prompt.assert_called_once()
@@ -485,7 +456,7 @@ class TestJarvisAssistant(unittest.TestCase):
         mock_speak_main.assert_any_call("Incorrect passphrase. Unauthorized access attempt detected. Counter-measures initiated. We are coming for you.", voice="Ava")
         mock_time_sleep.assert_any_call(3) # Check for the specific sleep after denial
         mock_sys_exit.assert_called_once_with()
-        mock_thread_class.assert_not_called()
+        mock_load_cues.return_value.play.assert_not_called()
         mock_open_apps.assert_not_called()
 
     @patch('main.load_config')
@@ -494,14 +465,15 @@ class TestJarvisAssistant(unittest.TestCase):
     @patch('main.show_initial_prompt')
     @patch('main.ask_for_password')
     @patch('main.speak')
-    @patch('sys.exit')
+    @patch('sys.exit', side_effect=SystemExit)
     @patch('time.sleep')
     def test_main_flow_name_denied(self, mock_time_sleep, mock_sys_exit, mock_speak, mock_ask_password,
                                  mock_show_prompt, mock_ask_name, mock_perform_facial_scan, mock_load_config):
         mock_load_config.return_value = {"voice": "Zarvox", "facial_scan_duration_seconds": 5}
-        jarvis_main.main()
+        with self.assertRaises(SystemExit):
+            jarvis_main.main()
 
-        mock_perform_facial_scan.assert_called_once_with(voice_for_errors="Zarvox", duration_seconds=5)
+        mock_perform_facial_scan.assert_called_once_with(voice_for_errors="Zarvox", duration_seconds=5, face_cascade=ANY)
         mock_ask_name.assert_called_once_with("Diego")
         mock_ask_password.assert_not_called()
         mock_speak.assert_any_call("Name verification failed. Identity not confirmed. Access denied.", voice="Zarvox")
@@ -509,10 +481,63 @@ class TestJarvisAssistant(unittest.TestCase):
         mock_sys_exit.assert_called_once_with()
         mock_show_prompt.assert_not_called() # Should not be called if name fails
 
+    @patch('main.load_config')
+    @patch('main.perform_facial_scan', return_value=True)
+    @patch('main.ask_for_name')
+    @patch('main.show_initial_prompt')
+    @patch('main.ask_for_password', return_value=False)
+    @patch('main.speak')
+    @patch('sys.exit', side_effect=SystemExit)
+    @patch('time.sleep')
+    def test_main_flow_identity_from_config(self, mock_time_sleep, mock_sys_exit, mock_speak, mock_ask_password,
+                                            mock_show_prompt, mock_ask_name, mock_perform_facial_scan, mock_load_config):
+        mock_load_config.return_value = {"identity_name": "Tony", "identity_passphrase": "mark 42"}
+        mock_ask_name.return_value = True
+        with self.assertRaises(SystemExit):
+            jarvis_main.main()
+        mock_ask_name.assert_called_once_with("Tony")
+        mock_ask_password.assert_called_once_with("mark 42")
+
+    @patch('main.load_config')
+    @patch('main.perform_facial_scan', return_value=True)
+    @patch('main.ask_for_identity', return_value=("tony", "mark 42"))
+    @patch('main.ask_for_name')
+    @patch('main.show_initial_prompt')
+    @patch('main.ask_for_password')
+    @patch('main.check_internet_connection', side_effect=InterruptedError("stop after verification"))
+    @patch('main.speak')
+    @patch('time.sleep')
+    def test_main_flow_combined_identity_granted(self, mock_time_sleep, mock_speak, mock_check_internet, mock_ask_password,
+                                                 mock_show_prompt, mock_ask_name, mock_ask_identity,
+                                                 mock_perform_facial_scan, mock_load_config):
+        mock_load_config.return_value = {"identity_name": "Tony", "identity_passphrase": "mark 42", "combined_identity_dialog": True}
+        with self.assertLogs(level='INFO') as logs:
+            with self.assertRaises(InterruptedError):
+                jarvis_main.main()
+        mock_ask_identity.assert_called_once_with()
+        mock_ask_name.assert_not_called()
+        mock_show_prompt.assert_not_called()
+        mock_ask_password.assert_not_called()
+        self.assertEqual(mock_time_sleep.call_count, 2) # Only the intro and post-scan pauses, none per dialog
+        self.assertTrue(any("Identity verification (combined) took" in line for line in logs.output))
+
+    @patch('main.load_config')
+    @patch('main.perform_facial_scan', return_value=True)
+    @patch('main.ask_for_identity', return_value=("Tony", "wrong"))
+    @patch('main.speak')
+    @patch('sys.exit', side_effect=SystemExit)
+    @patch('time.sleep')
+    def test_main_flow_combined_identity_wrong_passphrase(self, mock_time_sleep, mock_sys_exit, mock_speak,
+                                                          mock_ask_identity, mock_perform_facial_scan, mock_load_config):
+        mock_load_config.return_value = {"voice": "Ava", "identity_name": "Tony", "identity_passphrase": "mark 42", "combined_identity_dialog": True}
+        with self.assertRaises(SystemExit):
+            jarvis_main.main()
+        mock_speak.assert_any_call("Incorrect passphrase. Unauthorized access attempt detected. Counter-measures initiated. We are coming for you.", voice="Ava")
+
     @patch('main.load_config')
     @patch('main.perform_facial_scan', return_value=False)
     @patch('main.speak')
-    @patch('sys.exit')
+    @patch('sys.exit', side_effect=SystemExit)
     @patch('time.sleep')
     @patch('main.ask_for_name')
     @patch('main.show_initial_prompt')
@@ -521,14 +546,128 @@ class TestJarvisAssistant(unittest.TestCase):
                                           mock_time_sleep, mock_sys_exit, mock_speak,
                                           mock_perform_facial_scan, mock_load_config):
         mock_load_config.return_value = {"voice": "Tom", "facial_scan_duration_seconds": 5}
-        jarvis_main.main()
+        with self.assertRaises(SystemExit):
+            jarvis_main.main()
 
-        mock_perform_facial_scan.assert_called_once_with(voice_for_errors="Tom", duration_seconds=5)
+        mock_perform_facial_scan.assert_called_once_with(voice_for_errors="Tom", duration_seconds=5, face_cascade=ANY)
         mock_speak.assert_any_call("Facial scan failed or no face detected. Access denied.", voice="Tom")
         mock_sys_exit.assert_called_once_with()
         mock_ask_name.assert_not_called()
         mock_show_initial_prompt.assert_not_called()
         mock_ask_password.assert_not_called()
 
+    @patch('main.perform_facial_scan', return_value=True)
+    @patch('main.ask_for_name', return_value=True)
+    @patch('main.show_initial_prompt')
+    @patch('main.ask_for_password', return_value=True)
+    @patch('main.check_internet_connection')
+    @patch('main.play_video_fullscreen')
+    @patch('main.open_apps_and_folders')
+    @patch('main.run_dialog')
+    @patch('main.speak')
+    @patch('time.sleep')
+    def test_spent_boot_budget_skips_optional_stages_only(self, mock_time_sleep, mock_speak, mock_run_dialog, mock_open_apps,
+                                                          mock_play_video, mock_check_internet, mock_ask_password,
+                                                          mock_show_initial_prompt, mock_ask_name, mock_perform_facial_scan):
+        config = {"voice": "Tom", "boot_budget_seconds": 0, "startup_video_path": __file__}
+        with self.assertLogs(level='WARNING'):
+            budget = jarvis_main.run_boot_sequence(config, {"face_cascade": None, "cue_player": MagicMock()})
+
+        mock_perform_facial_scan.assert_called_once()
+        mock_ask_name.assert_called_once()
+        mock_ask_password.assert_called_once()
+        mock_open_apps.assert_called_once_with(config, skip_running=False)
+        mock_check_internet.assert_not_called()
+        mock_play_video.assert_not_called()
+        mock_run_dialog.assert_not_called() # The public IP offer is skipped too
+        mock_speak.assert_any_call("Skipping the startup video to stay within the boot time budget.", voice="Tom")
+        outcomes = {name: outcome for name, _, outcome in budget.stages}
+        self.assertEqual(outcomes, {"facial_scan": "completed", "identity": "completed", "network": "skipped", "video": "skipped",
+                                    "apps": "completed", "greeting": "completed", "ip_lookup": "skipped"})
+
+    @patch('main.SessionCache')
+    @patch('main.perform_facial_scan')
+    @patch('main.ask_for_name')
+    @patch('main.ask_for_password')
+    @patch('main.check_internet_connection', side_effect=InterruptedError("stop after verification"))
+    @patch('main.speak')
+    @patch('time.sleep')
+    def test_valid_session_skips_verification(self, mock_time_sleep, mock_speak, mock_check_internet, mock_ask_password,
+                                              mock_ask_name, mock_perform_facial_scan, mock_session_cache):
+        mock_session_cache.return_value.is_valid.return_value = True
+        with self.assertRaises(InterruptedError):
+            jarvis_main.run_boot_sequence({"session_ttl_seconds": 900}, {"face_cascade": None, "cue_player": MagicMock()})
+        mock_perform_facial_scan.assert_not_called()
+        mock_ask_name.assert_not_called()
+        mock_ask_password.assert_not_called()
+        mock_session_cache.return_value.issue.assert_not_called()
+
+    @patch('main.SessionCache')
+    @patch('main.perform_facial_scan', return_value=True)
+    @patch('main.ask_for_name', return_value=True)
+    @patch('main.show_initial_prompt')
+    @patch('main.ask_for_password', return_value=True)
+    @patch('main.check_internet_connection', side_effect=InterruptedError("stop after verification"))
+    @patch('main.speak')
+    @patch('time.sleep')
+    def test_verification_issues_session_token(self, mock_time_sleep, mock_speak, mock_check_internet, mock_ask_password,
+                                               mock_show_initial_prompt, mock_ask_name, mock_perform_facial_scan, mock_session_cache):
+        mock_session_cache.return_value.is_valid.return_value = False
+        with self.assertRaises(InterruptedError):
+            jarvis_main.run_boot_sequence({"session_ttl_seconds": 900}, {"face_cascade": None, "cue_player": MagicMock()})
+        mock_perform_facial_scan.assert_called_once()
+        mock_session_cache.return_value.issue.assert_called_once_with(900)
+
+    @patch('main.BootCheckpoint')
+    @patch('main.perform_facial_scan')
+    @patch('main.ask_for_name')
+    @patch('main.ask_for_password')
+    @patch('main.check_internet_connection', return_value=False)
+    @patch('main.open_apps_and_folders')
+    @patch('main.run_dialog', return_value=MagicMock(returncode=0, stdout="button returned:No"))
+    @patch('main.speak')
+    @patch('time.sleep')
+    def test_resumed_boot_skips_verification_and_running_apps(self, mock_time_sleep, mock_speak, mock_run_dialog, mock_open_apps,
+                                                              mock_check_internet, mock_ask_password, mock_ask_name,
+                                                              mock_perform_facial_scan, mock_boot_checkpoint):
+        checkpoint = mock_boot_checkpoint.return_value
+        checkpoint.resumed = True
+        checkpoint.recovery_seconds = 0.01
+        checkpoint.is_done.side_effect = lambda stage: stage in ("facial_scan", "identity")
+        config = {"resume_window_seconds": 900}
+        jarvis_main.run_boot_sequence(config, {"face_cascade": None, "cue_player": MagicMock()})
+
+        mock_boot_checkpoint.assert_called_once_with(config, 900)
+        mock_perform_facial_scan.assert_not_called()
+        mock_ask_name.assert_not_called()
+        mock_open_apps.assert_called_once_with(config, skip_running=True)
+        mock_speak.assert_any_call("Resuming the interrupted start-up.", voice=None)
+        checkpoint.clear.assert_called_once()
+
+    @patch('main.BootCheckpoint')
+    @patch('main.perform_facial_scan', return_value=False)
+    @patch('main.speak')
+    @patch('sys.exit', side_effect=SystemExit)
+    @patch('time.sleep')
+    def test_failed_verification_discards_checkpoint(self, mock_time_sleep, mock_sys_exit, mock_speak, mock_perform_facial_scan,
+                                                     mock_boot_checkpoint):
+        mock_boot_checkpoint.return_value.resumed = False
+        mock_boot_checkpoint.return_value.recovery_seconds = None
+        mock_boot_checkpoint.return_value.is_done.return_value = False
+        with self.assertRaises(SystemExit):
+            jarvis_main.run_boot_sequence({"resume_window_seconds": 900}, {"face_cascade": None, "cue_player": MagicMock()})
+        mock_boot_checkpoint.return_value.clear.assert_called_once()
+
+    @patch('main.launch')
+    @patch('main.run_dialog')
+    def test_open_apps_skips_running_apps(self, mock_run_dialog, mock_launch):
+        mock_run_dialog.side_effect = [
+            MagicMock(returncode=0, stdout="Spotify\n"), # running_apps
+            MagicMock(returncode=0, stdout="button returned:Open Apps"),
+        ]
+        jarvis_main.open_apps_and_folders({"apps": ["Spotify", "Notion"]}, skip_running=True)
+        self.assertIn('application "Notion" is running', mock_run_dialog.call_args_list[0][0][0])
+        mock_launch.assert_called_once_with(["open", "-a", "Notion"])
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,113 @@
+import unittest
+from unittest.mock import patch
+import sys
+import json
+import urllib.error
+import urllib.request
+
+import runner
+import metrics
+import checkins
+
+
+class TestRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = metrics.Registry()
+
+    def test_counters_gauges_and_labels(self):
+        self.registry.inc('jarvis_checkin_runs_total')
+        self.registry.inc('jarvis_checkin_runs_total')
+        self.registry.set('jarvis_boot_stage_seconds', 1.5, stage='network')
+        self.registry.set('jarvis_network_devices_by_manufacturer', 2, manufacturer='Say "hi"')
+        text = self.registry.render()
+        self.assertIn("# TYPE jarvis_checkin_runs_total counter\njarvis_checkin_runs_total 2\n", text)
+        self.assertIn('jarvis_boot_stage_seconds{stage="network"} 1.5\n', text)
+        self.assertIn('jarvis_network_devices_by_manufacturer{manufacturer="Say \\"hi\\""} 2\n', text)
+
+    def test_histogram_exposition(self):
+        self.registry.observe('jarvis_speak_seconds', 0.2)
+        self.registry.observe('jarvis_speak_seconds', 3)
+        text = self.registry.render()
+        self.assertIn("# TYPE jarvis_speak_seconds histogram", text)
+        self.assertIn('jarvis_speak_seconds_bucket{le="0.25"} 1\n', text)
+        self.assertIn('jarvis_speak_seconds_bucket{le="+Inf"} 2\n', text)
+        self.assertIn("jarvis_speak_seconds_sum 3.2\n", text)
+        self.assertIn("jarvis_speak_seconds_count 2\n", text)
+
+    def test_kind_mismatch_raises(self):
+        self.registry.inc('jarvis_thing')
+        with self.assertRaises(ValueError):
+            self.registry.set('jarvis_thing', 1)
+
+    def test_failing_collector_is_logged_not_raised(self):
+        def broken():
+            raise RuntimeError("boom")
+            yield
+        self.registry.add_collector(broken)
+        with self.assertLogs(level='ERROR'):
+            self.assertEqual(self.registry.render(), "\n")
+
+    def test_gauges_survive_export_and_import(self):
+        self.registry.set('jarvis_boot_stage_seconds', 4.0, stage='identity')
+        self.registry.inc('jarvis_checkin_runs_total')
+        restored = metrics.Registry()
+        restored.import_gauges(self.registry.export_gauges())
+        self.assertEqual(restored.render(), '# TYPE jarvis_boot_stage_seconds gauge\njarvis_boot_stage_seconds{stage="identity"} 4.0\n')
+
+
+class TestMetricsServer(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = metrics.Registry()
+        self.registry.add_collector(metrics.subprocess_collector)
+        self.server = metrics.start_server(0, registry=self.registry)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_scrape_over_http(self):
+        runner.run([sys.executable, "-c", "pass"])
+        self.registry.inc('jarvis_checkin_skipped_total', reason='pause_flag')
+        with urllib.request.urlopen(f"{self.base_url}/metrics", timeout=5) as response:
+            self.assertEqual(response.status, 200)
+            self.assertTrue(response.headers['Content-Type'].startswith('text/plain; version=0.0.4'))
+            body = response.read().decode()
+        self.assertIn('jarvis_checkin_skipped_total{reason="pause_flag"} 1', body)
+        self.assertIn('jarvis_subprocess_started_total{command="python', body)
+        self.assertIn('jarvis_subprocess_run_seconds_count{command="python', body)
+
+    def test_listens_on_localhost_only(self):
+        self.assertEqual(self.server.server_address[0], '127.0.0.1')
+
+    def test_unknown_path_is_404(self):
+        with self.assertRaises(urllib.error.HTTPError) as ctx:
+            urllib.request.urlopen(f"{self.base_url}/", timeout=5)
+        self.assertEqual(ctx.exception.code, 404)
+
+
+class TestCheckinMetrics(unittest.TestCase):
+
+    def value(self, name, **labels):
+        series = metrics.REGISTRY._collect().get(name, (None, {}))[1]
+        return series.get(tuple(sorted(labels.items())), 0)
+
+    @patch('os.path.exists', return_value=True)
+    def test_paused_checkin_counts_run_and_skip(self, mock_exists):
+        runs = self.value('jarvis_checkin_runs_total')
+        checkins.hourly_checkin({})
+        self.assertEqual(self.value('jarvis_checkin_runs_total'), runs + 1)
+        self.assertGreaterEqual(self.value('jarvis_checkin_skipped_total', reason='pause_flag'), 1)
+
+    def test_metrics_disabled_without_port(self):
+        self.assertIsNone(checkins.start_metrics({}))
+
+    @patch('checkins.current_rss_bytes', return_value=1234)
+    def test_rss_collector(self, mock_rss):
+        self.assertEqual(list(checkins.rss_collector()), [('gauge', 'jarvis_resident_memory_bytes', {}, 1234)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import unittest
+import os
+import json
+import tempfile
+import threading
+
+import notification_outbox
+
+
+class RecordingDeliver:
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.sent = []
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def __call__(self, title, message):
+        self.gate.wait(5)
+        if self.failures:
+            self.failures -= 1
+            return False
+        self.sent.append((title, message))
+        return True
+
+
+class TestNotificationOutbox(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.journal = os.path.join(self.tmpdir.name, "outbox.json")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def make_outbox(self, deliver, **kwargs):
+        outbox = notification_outbox.NotificationOutbox(deliver, journal_path=self.journal, **kwargs)
+        self.addCleanup(outbox.stop)
+        return outbox
+
+    def test_enqueue_returns_before_delivery(self):
+        deliver = RecordingDeliver()
+        deliver.gate.clear()
+        outbox = self.make_outbox(deliver).start()
+        outbox.enqueue("Jarvis", "Hello")
+        self.assertEqual(outbox.depth(), 1)
+        deliver.gate.set()
+        self.assertTrue(outbox.flush(5))
+        self.assertEqual(deliver.sent, [("Jarvis", "Hello")])
+        self.assertEqual(outbox.delivered, 1)
+        self.assertEqual(outbox.delivery_latency.count, 1)
+
+    def test_identical_pending_notifications_coalesce(self):
+        deliver = RecordingDeliver()
+        outbox = self.make_outbox(deliver)
+        outbox.enqueue("Jarvis", "Hello")
+        outbox.enqueue("Jarvis", "Hello")
+        outbox.enqueue("Jarvis", "Other")
+        self.assertEqual(outbox.depth(), 2)
+        self.assertEqual(outbox.coalesced, 1)
+        outbox.start()
+        self.assertTrue(outbox.flush(5))
+        self.assertEqual(deliver.sent, [("Jarvis", "Hello"), ("Jarvis", "Other")])
+
+    def test_failed_delivery_is_retried_with_backoff(self):
+        deliver = RecordingDeliver(failures=2)
+        outbox = self.make_outbox(deliver, base_backoff=0.01).start()
+        outbox.enqueue("Jarvis", "Hello")
+        self.assertTrue(outbox.flush(5))
+        self.assertEqual(deliver.sent, [("Jarvis", "Hello")])
+        self.assertEqual(outbox.retries, 2)
+
+    def test_gives_up_after_max_attempts(self):
+        deliver = RecordingDeliver(failures=10)
+        outbox = self.make_outbox(deliver, max_attempts=3, base_backoff=0.01).start()
+        with self.assertLogs(level='ERROR'):
+            outbox.enqueue("Jarvis", "Hello")
+            self.assertTrue(outbox.flush(5))
+        self.assertEqual(deliver.sent, [])
+        self.assertEqual(outbox.dropped, 1)
+        with open(self.journal) as f:
+            self.assertEqual(json.load(f), [])
+
+    def test_pending_notifications_survive_restart(self):
+        first = self.make_outbox(RecordingDeliver()) # Never started, as if the process died
+        first.enqueue("Jarvis", "Hello")
+        self.assertFalse(os.path.exists(self.journal + ".tmp"))
+
+        deliver = RecordingDeliver()
+        second = self.make_outbox(deliver)
+        self.assertEqual(second.depth(), 1)
+        second.start()
+        self.assertTrue(second.flush(5))
+        self.assertEqual(deliver.sent, [("Jarvis", "Hello")])
+
+    def test_corrupt_journal_starts_empty(self):
+        with open(self.journal, 'w') as f:
+            f.write("{not json")
+        with self.assertLogs(level='ERROR'):
+            outbox = self.make_outbox(RecordingDeliver())
+        self.assertEqual(outbox.depth(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+import unittest
+import os
+import sys
+import time
+import tempfile
+import subprocess
+import threading
+
+import runner
+
+
+def pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    return True
+
+
+class TestRunner(unittest.TestCase):
+
+    def setUp(self):
+        self.runner = runner.Runner(max_concurrent=2)
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_run_captures_output_and_records_stats(self):
+        result = self.runner.run([sys.executable, "-c", "print('hi')"])
+        self.assertEqual(result.returncode, 0)
+        self.assertEqual(result.stdout.strip(), "hi")
+        stats = self.runner.stats[os.path.basename(sys.executable)]
+        self.assertEqual((stats.started, stats.succeeded, stats.failed), (1, 1, 0))
+        self.assertEqual(stats.spawn_latency.count, 1)
+        self.assertEqual(stats.run_latency.count, 1)
+
+    def test_non_zero_exit_counts_as_failed(self):
+        result = self.runner.run([sys.executable, "-c", "import sys; sys.exit(3)"])
+        self.assertEqual(result.returncode, 3)
+        self.assertEqual(self.runner.stats[os.path.basename(sys.executable)].failed, 1)
+
+    def pid_file_command(self, seconds):
+        # A child that records its PID, so tests can check it is gone (kill(pid, 0) still succeeds on a zombie)
+        self.pid_file = os.path.join(self.tmpdir.name, "child.pid")
+        return [sys.executable, "-c", f"import os, time; open({self.pid_file!r}, 'w').write(str(os.getpid())); time.sleep({seconds})"]
+
+    def child_pid(self):
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            if os.path.exists(self.pid_file) and open(self.pid_file).read():
+                return int(open(self.pid_file).read())
+            time.sleep(0.02)
+        self.fail("child never wrote its pid")
+
+    def test_timeout_kills_and_reaps(self):
+        with self.assertRaises(subprocess.TimeoutExpired):
+            self.runner.run(self.pid_file_command(30), timeout=0.5)
+        self.assertFalse(pid_alive(self.child_pid()))
+        self.assertEqual(self.runner.stats[os.path.basename(sys.executable)].timed_out, 1)
+
+    def test_spawn_missing_command_raises(self):
+        with self.assertRaises(FileNotFoundError):
+            self.runner.spawn(["definitely-not-a-real-command-jarvis"])
+        self.assertEqual(self.runner.stats["definitely-not-a-real-command-jarvis"].failed, 1)
+
+    def test_cancel_kills_and_reaps_before_returning(self):
+        job = self.runner.spawn(self.pid_file_command(30))
+        pid = self.child_pid()
+        self.assertFalse(job.done())
+        self.assertTrue(job.cancel())
+        self.assertTrue(job.done())
+        self.assertFalse(pid_alive(pid))
+        self.assertEqual(self.runner.stats[os.path.basename(sys.executable)].cancelled, 1)
+
+    def test_spawned_job_reaped_after_exit(self):
+        job = self.runner.spawn(["true"])
+        self.assertTrue(job.wait(5))
+        self.assertEqual(job.result(5).returncode, 0)
+
+    def test_concurrency_cap_limits_run(self):
+        # With a cap of 2, three 0.4 s commands started together need two rounds
+        started = time.perf_counter()
+        threads = [threading.Thread(target=self.runner.run, args=(["sleep", "0.4"],)) for _ in range(3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertGreaterEqual(time.perf_counter() - started, 0.8)
+
+    def test_spawned_jobs_release_their_slot(self):
+        jobs = [self.runner.spawn(["sleep", "30"]) for _ in range(3)]
+        try:
+            result = self.runner.run(["true"], timeout=5)
+            self.assertEqual(result.returncode, 0)
+        finally:
+            for job in jobs:
+                job.cancel()
+
+    def test_spawn_gives_up_when_no_slot_frees(self):
+        blockers = [threading.Thread(target=self.runner.run, args=(["sleep", "1"],)) for _ in range(2)]
+        for t in blockers:
+            t.start()
+        time.sleep(0.2)
+        with self.assertRaises(TimeoutError):
+            self.runner.spawn(["true"], wait=0.1)
+        for t in blockers:
+            t.join()
+
+    def test_deadline_clamps_run_timeout(self):
+        with runner.deadline(time.monotonic() + 0.3):
+            started = time.perf_counter()
+            with self.assertRaises(subprocess.TimeoutExpired):
+                self.runner.run(["sleep", "30"], timeout=60)
+            self.assertLess(time.perf_counter() - started, 5)
+            time.sleep(0.3)
+            with self.assertRaises(subprocess.TimeoutExpired): # Already past: nothing is started
+                self.runner.run(["true"])
+        self.assertEqual(self.runner.stats["sleep"].timed_out, 1)
+        self.assertEqual(self.runner.stats["true"].started, 0)
+        self.assertEqual(runner.time_left(5), 5) # Lifted on exit
+
+
+class TestHistogram(unittest.TestCase):
+
+    def test_bucketing_and_cumulative(self):
+        histogram = runner.Histogram(buckets=(0.1, 1))
+        for value in (0.05, 0.1, 0.5, 2):
+            histogram.observe(value)
+        self.assertEqual(histogram.counts, [2, 1, 1])
+        self.assertEqual(histogram.count, 4)
+        self.assertAlmostEqual(histogram.sum, 2.65)
+        self.assertEqual(histogram.cumulative(), [(0.1, 2), (1, 3), (float('inf'), 4)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+from unittest.mock import patch
+import os
+import json
+import stat
+import tempfile
+
+import session_cache
+
+
+class TestSessionCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache = session_cache.SessionCache(path=os.path.join(self.tmpdir.name, "session"),
+                                                key_path=os.path.join(self.tmpdir.name, "session.key"))
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_issued_token_is_valid_and_private(self):
+        self.assertFalse(self.cache.is_valid())
+        self.assertTrue(self.cache.issue(60))
+        self.assertTrue(self.cache.is_valid())
+        for path in (self.cache.path, self.cache.key_path):
+            self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0o600)
+
+    def test_expired_token_is_rejected(self):
+        self.cache.issue(60)
+        with patch('time.time', return_value=os.path.getmtime(self.cache.path) + 120):
+            self.assertFalse(self.cache.is_valid())
+
+    def test_tampered_token_is_rejected(self):
+        self.cache.issue(1)
+        with open(self.cache.path) as f:
+            token = json.load(f)
+        claims = json.loads(token["payload"])
+        claims["expires_at"] += 3600
+        token["payload"] = json.dumps(claims, sort_keys=True)
+        with open(self.cache.path, 'w') as f:
+            json.dump(token, f)
+        with self.assertLogs(level='WARNING'):
+            self.assertFalse(self.cache.is_valid())
+
+    def test_token_is_bound_to_machine(self):
+        self.cache.issue(60)
+        with patch('session_cache.machine_id', return_value="elsewhere:000000000000"):
+            with self.assertLogs(level='WARNING'):
+                self.assertFalse(self.cache.is_valid())
+
+    def test_world_readable_token_is_rejected(self):
+        self.cache.issue(60)
+        os.chmod(self.cache.path, 0o644)
+        with self.assertLogs(level='WARNING'):
+            self.assertFalse(self.cache.is_valid())
+
+    def test_clear(self):
+        self.cache.issue(60)
+        self.cache.clear()
+        self.assertFalse(self.cache.is_valid())
+        self.cache.clear() # Already gone is fine
+
+
+if __name__ == '__main__':
+    unittest.main()
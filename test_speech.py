@@ -0,0 +1,166 @@
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import time
+import threading
+import subprocess
+import concurrent.futures
+
+import runner
+import speech
+
+
+class FakeJob:
+    """Finishes `duration` seconds after it is created, like a spawned say/afplay."""
+
+    def __init__(self, cmd, duration, returncode=0):
+        self.cmd = cmd
+        self.returncode = returncode
+        self._cancelled = False
+        self._settled = threading.Event()
+        self._timer = threading.Timer(duration, self._settled.set)
+        self._timer.start()
+
+    def wait(self, timeout=None):
+        return self._settled.wait(timeout)
+
+    def result(self, timeout=None):
+        if self._cancelled:
+            raise concurrent.futures.CancelledError()
+        return subprocess.CompletedProcess(self.cmd, self.returncode)
+
+    def cancel(self, timeout=5):
+        if not self._settled.is_set():
+            self._cancelled = True
+            self._timer.cancel()
+            self._settled.set()
+        return True
+
+
+class RecordingSynthesizer:
+    """Stand-in synthesizer that records when each step starts and ends."""
+
+    def __init__(self, speak_seconds=0.1, render_seconds=0.05, fail_render=None):
+        self.speak_seconds = speak_seconds
+        self.render_seconds = render_seconds
+        self.fail_render = fail_render
+        self.events = [] # (event, sentence, perf_counter)
+        self.discarded = []
+        self.jobs = []
+
+    def _job(self, event, sentence, duration, returncode=0):
+        self.events.append((event, sentence, time.perf_counter()))
+        job = FakeJob([event, sentence], duration, returncode)
+        self.jobs.append(job)
+        return job
+
+    def say(self, sentence, voice=None):
+        return self._job("say", sentence, self.speak_seconds)
+
+    def render(self, sentence, voice=None):
+        returncode = 1 if sentence == self.fail_render else 0
+        return f"clip:{sentence}", self._job("render", sentence, self.render_seconds, returncode)
+
+    def play(self, clip):
+        return self._job("play", clip[len("clip:"):], self.speak_seconds)
+
+    def discard(self, clip):
+        self.discarded.append(clip)
+
+    def started(self, event, sentence):
+        return next(t for e, s, t in self.events if e == event and s == sentence)
+
+
+class TestSplitSentences(unittest.TestCase):
+
+    def test_splits_on_sentence_punctuation(self):
+        text = "Network status: Connected. I've detected 2 devices!  Anything else? Bye"
+        self.assertEqual(speech.split_sentences(text),
+                         ["Network status: Connected.", "I've detected 2 devices!", "Anything else?", "Bye"])
+
+    def test_keeps_decimals_and_empty_text(self):
+        self.assertEqual(speech.split_sentences("Version 2.5 is ready."), ["Version 2.5 is ready."])
+        self.assertEqual(speech.split_sentences("   "), [])
+
+
+class TestUtterance(unittest.TestCase):
+
+    def test_speaks_every_sentence_in_order(self):
+        synth = RecordingSynthesizer()
+        self.assertTrue(speech.speak("One. Two. Three.", synthesizer=synth))
+        spoken = [(e, s) for e, s, _ in synth.events if e in ("say", "play")]
+        self.assertEqual(spoken, [("say", "One."), ("play", "Two."), ("play", "Three.")])
+        self.assertEqual(synth.discarded, ["clip:Two.", "clip:Three."])
+
+    def test_next_sentence_renders_while_current_plays(self):
+        synth = RecordingSynthesizer()
+        speech.speak("One. Two. Three.", synthesizer=synth)
+        # Sentence 2 is rendered during sentence 1, sentence 3 during sentence 2
+        self.assertLess(synth.started("render", "Two."), synth.started("play", "Two."))
+        self.assertLess(synth.started("render", "Three."), synth.started("play", "Three."))
+        self.assertLess(synth.started("render", "Three.") - synth.started("play", "Two."), synth.speak_seconds)
+
+    def test_first_audio_latency_independent_of_length(self):
+        short = speech.Utterance("Hi.", synthesizer=RecordingSynthesizer(speak_seconds=0.01, render_seconds=0.01))
+        long = speech.Utterance(" ".join(f"Sentence {i}." for i in range(20)),
+                                synthesizer=RecordingSynthesizer(speak_seconds=0.01, render_seconds=0.01))
+        short.run()
+        long.run()
+        self.assertLess(long.first_audio_latency, 0.05)
+        self.assertLess(short.first_audio_latency, 0.05)
+
+    def test_cancel_mid_message(self):
+        synth = RecordingSynthesizer(speak_seconds=0.3)
+        utterance = speech.Utterance("One. Two. Three. Four.", synthesizer=synth)
+        threading.Timer(0.45, utterance.cancel).start() # During sentence two
+        started = time.perf_counter()
+        self.assertFalse(utterance.run())
+        self.assertLess(time.perf_counter() - started, 0.8)
+        self.assertTrue(utterance.cancelled())
+        played = [s for e, s, _ in synth.events if e == "play"]
+        self.assertEqual(played, ["Two."])
+        self.assertTrue(all(job.wait(0) for job in synth.jobs)) # Nothing left running
+
+    def test_failed_render_stops_the_message(self):
+        synth = RecordingSynthesizer(fail_render="Two.")
+        with self.assertLogs(level='ERROR'):
+            self.assertFalse(speech.speak("One. Two. Three.", synthesizer=synth))
+        self.assertNotIn("play", [e for e, _, _ in synth.events])
+
+    def test_runner_deadline_bounds_the_message(self):
+        synth = RecordingSynthesizer(speak_seconds=30)
+        with runner.deadline(time.monotonic() + 0.2):
+            with self.assertRaises(subprocess.TimeoutExpired):
+                speech.speak("One. Two.", synthesizer=synth)
+        self.assertTrue(all(job.wait(0) for job in synth.jobs))
+
+
+class TestSaySynthesizer(unittest.TestCase):
+
+    @patch('runner.spawn')
+    def test_commands(self, mock_spawn):
+        synth = speech.SaySynthesizer(workdir="/tmp/speech")
+        synth.say("Hello.", voice="Daniel")
+        mock_spawn.assert_called_with(["say", "-v", "Daniel", "Hello."], timeout=speech.SPEAK_TIMEOUT)
+        clip, _ = synth.render("Hello.")
+        self.assertTrue(clip.startswith("/tmp/speech/") and clip.endswith(".aiff"))
+        mock_spawn.assert_called_with(["say", "-o", clip, "Hello."], timeout=speech.SPEAK_TIMEOUT)
+        synth.play(clip)
+        mock_spawn.assert_called_with(["afplay", clip], timeout=speech.SPEAK_TIMEOUT)
+
+    def test_own_workdir_is_removed(self):
+        synth = speech.SaySynthesizer()
+        self.assertTrue(os.path.isdir(synth.workdir))
+        synth.cleanup()
+        self.assertFalse(os.path.exists(synth.workdir))
+
+    def test_own_workdir_is_removed_at_exit(self):
+        project_dir = os.path.dirname(os.path.abspath(__file__))
+        result = subprocess.run([sys.executable, "-c", "import speech; print(speech.default_synthesizer().workdir)"],
+                                capture_output=True, text=True, cwd=project_dir, check=True)
+        self.assertFalse(os.path.exists(result.stdout.strip()))
+
+
+if __name__ == '__main__':
+    unittest.main()